@@ -0,0 +1,299 @@
+"""
+In-process benchmarks for the core hot paths.
+
+Each benchmark runs against a fresh database in a temporary directory holding `scale`
+parts. Bulk operations (add_parts, CSV import/export, car assembly and cloning) process
+`scale` items; per-row database operations and report generation are timed for `--ops`
+calls against the table of that size, so large scales stay practical.
+
+    python -m benchmarks.run --scale 1k,100k --output results.json
+    python -m benchmarks.run --scale 1k --save-baseline        # record benchmarks/baseline.json
+    python -m benchmarks.run --scale 1k                        # compare, exit 1 on regression
+    python -m benchmarks.run --scale 1m --no-compare           # measure only
+
+Results are JSON: per `name@scale`, the item count, best and median seconds over
+`--repeat` runs, and items per second. A result is a regression when its best rate is
+more than `--tolerance` below the baseline. The comparison also fails when there is no
+baseline file, or when the baseline has a benchmark at a scale that was run but the run
+did not produce it (a benchmark was renamed or removed without re-saving the baseline).
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from core.CarPartDatabase import CarPartDatabase, ReportManager
+from core.car_parts import CarBuilder, SedanFactory, part_registry, set_part_store
+from core.data_io import export_parts, import_parts_csv
+from utils.singleton import SingletonMeta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+SCALES = {"1k": 1000, "100k": 100000, "1m": 1000000}
+
+# name -> setup function; setup(workdir, scale, ops) returns (items, timed callable)
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def parse_scale(value):
+    value = value.strip().lower()
+    if value in SCALES:
+        return SCALES[value]
+    return int(value)
+
+
+def scale_name(scale):
+    for name, value in SCALES.items():
+        if value == scale:
+            return name
+    return str(scale)
+
+
+def open_database(workdir, scale):
+    """A database of `scale` parts named part<i>, all of type "tires"."""
+    SingletonMeta.reset_all()
+    database = CarPartDatabase(os.path.join(workdir, "parts.db"), seed=False)
+    database.add_parts(("tires", f"part{i}", i % 500 + 1) for i in range(scale))
+    return database
+
+
+def sample(scale, ops, seed=0):
+    rng = random.Random(seed)
+    return [rng.randrange(scale) for _ in range(min(ops, scale))]
+
+
+@benchmark("db.add_part")
+def bench_add_part(workdir, scale, ops):
+    database = open_database(workdir, scale)
+    names = [f"new{i}" for i in range(min(ops, scale))]
+    return len(names), lambda: [database.add_part("wheels", name, 100) for name in names]
+
+
+@benchmark("db.add_parts")
+def bench_add_parts(workdir, scale, ops):
+    database = open_database(workdir, 0)
+    return scale, lambda: database.add_parts(("tires", f"part{i}", 100) for i in range(scale))
+
+
+@benchmark("db.get_part")
+def bench_get_part(workdir, scale, ops):
+    database = open_database(workdir, scale)
+    keys = [("tires", f"part{i}") for i in sample(scale, ops)]
+    return len(keys), lambda: [database.get_part(*key) for key in keys]
+
+
+@benchmark("db.update_part")
+def bench_update_part(workdir, scale, ops):
+    database = open_database(workdir, scale)
+    ids = [i + 1 for i in sample(scale, ops)]
+    return len(ids), lambda: [database.update_part(part_id, price=200) for part_id in ids]
+
+
+@benchmark("db.delete_part")
+def bench_delete_part(workdir, scale, ops):
+    database = open_database(workdir, scale)
+    names = [f"part{i}" for i in sorted(set(sample(scale, ops)))]
+    return len(names), lambda: [database.delete_part(name) for name in names]
+
+
+def _catalog(workdir):
+    database = open_database(workdir, 0)
+    database.seed_default_parts()
+    set_part_store(database)
+    return database
+
+
+@benchmark("car.build")
+def bench_build(workdir, scale, ops):
+    _catalog(workdir)
+    factory = SedanFactory()
+
+    def run():
+        for _ in range(scale):
+            builder = CarBuilder(factory)
+            builder.set_engine()
+            builder.set_color()
+            builder.build()
+    return scale, run
+
+
+@benchmark("car.clone")
+def bench_clone(workdir, scale, ops):
+    _catalog(workdir)
+    builder = CarBuilder(SedanFactory())
+    builder.set_engine()
+    builder.set_color()
+    car = builder.build()
+    return scale, lambda: car.clone_many(scale)
+
+
+@benchmark("reports.generate_report")
+def bench_generate_report(workdir, scale, ops):
+    _catalog(workdir)
+    builder = CarBuilder(SedanFactory())
+    builder.set_engine()
+    builder.set_color()
+    car = builder.build()
+    manager = ReportManager(os.path.join(workdir, "reports.db"), os.path.join(workdir, "reports.json"))
+    count = min(ops, scale)
+
+    def run():
+        # Includes writing every report to disk; the per-report print goes to devnull
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for _ in range(count):
+                manager.generate_report(car)
+        manager.flush()
+    return count, run
+
+
+@benchmark("csv.export")
+def bench_export(workdir, scale, ops):
+    database = open_database(workdir, scale)
+    return scale, lambda: export_parts(database, os.path.join(workdir, "parts.csv"))
+
+
+@benchmark("csv.import")
+def bench_import(workdir, scale, ops):
+    path = os.path.join(workdir, "import.csv")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("type,name,price\n")
+        file.writelines(f"tires,part{i},{i % 500 + 1}\n" for i in range(scale))
+    database = open_database(workdir, 0)
+    return scale, lambda: import_parts_csv(database, path)
+
+
+def run_one(name, scale, ops, repeat):
+    """Time benchmark `name` `repeat` times, each from a fresh setup."""
+    times = []
+    for _ in range(repeat):
+        workdir = tempfile.mkdtemp(prefix="carparts-bench-")
+        try:
+            items, timed = BENCHMARKS[name](workdir, scale, ops)
+            start = time.perf_counter()
+            timed()
+            times.append(time.perf_counter() - start)
+        finally:
+            for instance in SingletonMeta.instances():
+                close = getattr(instance, "close", None)
+                if close is not None:
+                    close()
+            SingletonMeta.reset_all()
+            set_part_store(None)
+            part_registry.clear()
+            shutil.rmtree(workdir, ignore_errors=True)
+    best = min(times)
+    return {"items": items, "best_s": best, "median_s": statistics.median(times),
+            "items_per_s": items / best if best else None}
+
+
+def compare(results, baseline, tolerance):
+    """Return `(name, baseline rate, rate)` for every result slower than the baseline allows."""
+    regressions = []
+    for key, result in results.items():
+        expected = baseline.get("results", {}).get(key)
+        if not expected or not expected.get("items_per_s") or not result["items_per_s"]:
+            continue
+        if result["items_per_s"] < expected["items_per_s"] * (1 - tolerance):
+            regressions.append((key, expected["items_per_s"], result["items_per_s"]))
+    return regressions
+
+
+def missing_results(results, baseline, scales, prefixes=None):
+    """Baseline keys at the run's `scales` (and `--only` prefixes) that have no result."""
+    missing = []
+    for key in baseline.get("results", {}):
+        name, _, scale = key.rpartition("@")
+        if key in results or scale not in scales:
+            continue
+        if prefixes and not any(name.startswith(prefix) for prefix in prefixes):
+            continue
+        missing.append(key)
+    return sorted(missing)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Core hot path benchmarks")
+    parser.add_argument("--scale", default="1k", help="comma-separated: 1k, 100k, 1m or a number")
+    parser.add_argument("--ops", type=int, default=10000, help="calls for per-row benchmarks")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", help="comma-separated benchmark names or prefixes")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline, as a fraction")
+    parser.add_argument("--no-compare", action="store_true",
+                        help="only measure; skip the baseline comparison")
+    args = parser.parse_args(argv)
+
+    names = list(BENCHMARKS)
+    prefixes = args.only.split(",") if args.only else None
+    if prefixes:
+        names = [name for name in names if any(name.startswith(prefix) for prefix in prefixes)]
+
+    results = {}
+    scales = [parse_scale(value) for value in args.scale.split(",")]
+    for scale in scales:
+        for name in names:
+            key = f"{name}@{scale_name(scale)}"
+            results[key] = result = run_one(name, scale, args.ops, args.repeat)
+            print(f"{key:<32} {result['items']:>9} items  {result['best_s']:9.4f} s  "
+                  f"{result['items_per_s']:>12,.0f} /s")
+
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "ops": args.ops, "repeat": args.repeat, "created_at": datetime.now().isoformat()},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    if args.save_baseline:
+        baseline = {"meta": report["meta"], "results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as file:
+                baseline = json.load(file)
+        baseline["meta"] = report["meta"]
+        baseline["results"].update(results)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if args.no_compare:
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"FAILED: no baseline at {args.baseline}; run with --save-baseline to create one "
+              f"or --no-compare to only measure")
+        return 1
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, args.tolerance)
+    missing = missing_results(results, baseline, {scale_name(scale) for scale in scales}, prefixes)
+    for key in sorted(set(results) - set(baseline.get("results", {}))):
+        print(f"NEW {key}: not in the baseline, not compared")
+    for key in missing:
+        print(f"MISSING {key}: in the baseline but not produced by this run")
+    for key, expected, actual in regressions:
+        print(f"REGRESSION {key}: {actual:,.0f}/s, baseline {expected:,.0f}/s "
+              f"({(1 - actual / expected) * 100:.0f}% slower)")
+    return 1 if regressions or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Startup import-time benchmark.
+
+Runs `python -X importtime` on the modules loaded before the first window is drawn and
+reports the cumulative import time of each, plus the slowest individual imports. With
+`--max-ms` the script exits with status 1 when the startup imports take longer, so it can
+guard against heavy modules creeping back into the startup path:
+
+    python benchmarks/startup_importtime.py --repeat 5 --max-ms 150
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules imported between `python main.py` and the first painted window
+STARTUP_MODULES = ["main", "tkinter", "gui.car_parts_gui"]
+# Modules that must not be imported at startup
+DEFERRED_MODULES = ["sqlite3", "pyotp", "core.CarPartDatabase", "security.auth"]
+
+
+def parse_importtime(stderr):
+    """Return `{module: (self_us, cumulative_us)}` from `-X importtime` output."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        times[module.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def measure(modules):
+    """Import `modules` in a fresh interpreter and return its importtime table."""
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="runs to take the best of")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--max-ms", type=float, help="fail when startup imports exceed this")
+    args = parser.parse_args(argv)
+
+    runs = [measure(STARTUP_MODULES) for _ in range(args.repeat)]
+    best = min(runs, key=lambda times: sum(times[m][1] for m in STARTUP_MODULES if m in times))
+    total_ms = sum(best[m][1] for m in STARTUP_MODULES if m in best) / 1000
+
+    print(f"Startup imports (best of {args.repeat}): {total_ms:.1f} ms")
+    for module in STARTUP_MODULES:
+        print(f"  {module:<24} {best.get(module, (0, 0))[1] / 1000:8.1f} ms")
+    print("Slowest imports by self time:")
+    for module, (self_us, _) in sorted(best.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"  {module:<40} {self_us / 1000:8.1f} ms")
+
+    failed = False
+    loaded = [module for module in DEFERRED_MODULES if module in best]
+    if loaded:
+        print(f"FAIL: loaded at startup: {', '.join(loaded)}")
+        failed = True
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"FAIL: startup imports took {total_ms:.1f} ms, budget is {args.max_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,29 @@
 import sqlite3
+import itertools
 import json
+from collections import deque
 from datetime import datetime
 from utils.singleton import SingletonMeta
+from utils.cache import LRUCache
+from utils.metrics import instrument
+from utils.profiling import profile
+from .connection_pool import ConnectionPool
+from .migrations import migrate
+from .part_index import PartNameIndex
+from .report_writer import ReportWriter
+
+
+# Catalog written to a new, empty `parts` table.
+DEFAULT_PARTS = {
+    "engines": {"V8": 500, "V6": 300},
+    "colors": {"red": "FF0000", "blue": "0000FF"},
+    "tires": {"Pirelli": 100, "Michelin": 150},
+    "wheels": {"alloy": 200, "steel": 50},
+    "seats": {"leather": 300, "cloth": 100}
+}
+
+# Columns page_parts returns and can sort by
+PAGE_COLUMNS = ("id", "type", "name", "price")
 
 
 def create_connection(db_file):
@@ -26,22 +48,7 @@ def create_tables(conn):
     represents a connection to a database. This connection object is used to create a cursor object,
     execute SQL queries to create tables, and commit the changes to the database
     """
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS car_parts (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            type TEXT NOT NULL
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS engines (
-            id INTEGER PRIMARY KEY,
-            model TEXT NOT NULL,
-            horsepower INTEGER NOT NULL
-        )
-    ''')
-    conn.commit()
+    return migrate(conn, "legacy")
 
 
 def insert_car_part(conn, name, part_type):
@@ -92,10 +99,21 @@ def close_connection(conn):
 
 
 class ReportManager(metaclass=SingletonMeta):
-    def __init__(self, db_file='reports.db'):
-        self.reports = []
+    @classmethod
+    def singleton_key(cls, db_file='reports.db', *args, **kwargs):
+        """One manager per report database."""
+        return db_file
+
+    def __init__(self, db_file='reports.db', json_file='reports.json', batch_size=100,
+                 flush_interval=1.0, max_queue=10000, capacity=1000):
+        # Only the most recent reports stay in memory; older ones are read back with query_reports
+        self.reports = deque(maxlen=capacity)
+        self.db_file = db_file
+        self.closed = False
         self.conn = self.create_connection(db_file)
         self.create_report_table()
+        self.writer = ReportWriter(db_file, json_file, batch_size=batch_size,
+                                   flush_interval=flush_interval, max_queue=max_queue)
 
     def create_connection(self, db_file):
         """Create a database connection to the SQLite database."""
@@ -103,18 +121,8 @@ class ReportManager(metaclass=SingletonMeta):
         return conn
 
     def create_report_table(self):
-        """Create a table for storing reports if it doesn't exist."""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS reports (
-                id INTEGER PRIMARY KEY,
-                engine TEXT NOT NULL,
-                color TEXT NOT NULL,
-                price REAL NOT NULL,
-                created_at TEXT NOT NULL
-            )
-        ''')
-        self.conn.commit()
+        """Bring the reports table up to date with the `reports` migrations."""
+        return migrate(self.conn, "reports")
 
     def insert_car_part(self, name, part_type):
         """Insert a car part into the database."""
@@ -124,6 +132,7 @@ class ReportManager(metaclass=SingletonMeta):
         ''', (name, part_type))
         self.conn.commit()
 
+    @instrument("reports.generate_report")
     def generate_report(self, car):
         """Generate a report for the car."""
         report = {
@@ -134,76 +143,177 @@ class ReportManager(metaclass=SingletonMeta):
         }
         self.reports.append(report)
         print("Report generated:", report)
-        self.save_report_to_file(report)
-        self.save_report_to_db(report)
-
-    def save_report_to_file(self, report):
-        """Save the report to a JSON file."""
-        with open('reports.json', 'a') as f:
-            f.write(json.dumps(report) + '\n')
-
-    def save_report_to_db(self, report):
-        """Save the report to the SQLite database."""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO reports (engine, color, price, created_at) VALUES (?, ?, ?, ?)
-        ''', (report['engine'], report['color'], report['price'], report['created_at']))
-        self.conn.commit()
+        # Persisted by the background writer, in batches, to reports.json and reports.db
+        self.writer.submit(report)
+        return report
+
+    def add_reports(self, reports):
+        """
+        Record many already built reports at once, without printing each one. Invalid
+        reports are skipped with an error message; returns how many were recorded.
+        """
+        count = 0
+        for report in reports:
+            try:
+                self.writer.submit(report)
+            except ValueError as e:
+                print(f"Error adding report: {e}")
+                continue
+            self.reports.append(report)
+            count += 1
+        return count
+
+    def flush(self):
+        """Block until every generated report has been written to disk."""
+        self.writer.flush()
 
     def get_reports(self):
-        return self.reports
+        """Return the reports still held in the in-memory ring buffer, oldest first."""
+        return list(self.reports)
+
+    def query_reports(self, engine=None, color=None, min_price=None, max_price=None,
+                      since=None, until=None, before_id=None, limit=50):
+        """
+        Page through stored reports, newest first.
+
+        Every filter is optional; `since` and `until` are inclusive ISO timestamps. Pass the
+        smallest `id` of a page as `before_id` to fetch the next one. Pending reports are
+        flushed first so the result includes everything generated so far.
+        """
+        self.flush()
+        conditions = []
+        params = []
+        for clause, value in (("engine = ?", engine), ("color = ?", color),
+                              ("price >= ?", min_price), ("price <= ?", max_price),
+                              ("created_at >= ?", since), ("created_at <= ?", until),
+                              ("id < ?", before_id)):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+        try:
+            cursor = self.conn.execute(f'''
+                SELECT id, engine, color, price, created_at FROM reports
+                {where} ORDER BY id DESC LIMIT ?
+            ''', params)
+            return [dict(zip(("id", "engine", "color", "price", "created_at"), row))
+                    for row in cursor]
+        except sqlite3.Error as e:
+            print(f"Error querying reports: {e}")
+            return []
 
     def close(self):
+        """Write pending reports, close the store and unregister this manager."""
+        if self.closed:
+            return
+        self.closed = True
+        self.writer.close()
         if self.conn:
             self.conn.close()
+        # The next ReportManager for this file must be a fresh, open one
+        type(self).reset(self.db_file)
+
+
+# The iter_* generators fetch through these, so each batch is recorded as one call of
+# its generator's operation, timed and counted in rows
+_fetch_by_type = instrument("db.iter_by_type", items=len)(sqlite3.Cursor.fetchmany)
+_fetch_parts = instrument("db.iter_parts", items=len)(sqlite3.Cursor.fetchmany)
 
 
 class CarPartDatabase(metaclass=SingletonMeta):
-    def __init__(self, db_file='car_parts.db'):
-        self.conn = self.create_connection(db_file)
+    """
+    Parts catalog and inventory in SQLite. Public methods record metrics under
+    `db.<method>`; `iter_by_type` and `iter_parts` record one call per batch fetched,
+    with its rows as items. Properties and underscore helpers are not instrumented.
+    """
+
+    @classmethod
+    def singleton_key(cls, db_file='car_parts.db', *args, **kwargs):
+        """One database object per SQLite file."""
+        return db_file
+
+    def __init__(self, db_file='car_parts.db', pool_size=8, synchronous='NORMAL',
+                 cache_size=-64000, mmap_size=268435456, part_cache_size=1024,
+                 part_cache_ttl=300, seed=True):
+        self.pool = self.create_connection(db_file, pool_size, synchronous, cache_size, mmap_size)
+        self.part_cache = LRUCache(maxsize=part_cache_size, ttl=part_cache_ttl)
+        self._name_index = None
+        # Category -> number of its latest change made through this object
+        self._category_versions = {}
+        self._version_counter = itertools.count(1)
         self.create_tables()
-        self.parts = {
-            "engines": {"V8": 500, "V6": 300},
-            "colors": {"red": "FF0000", "blue": "0000FF"},
-            "tires": {"Pirelli": 100, "Michelin": 150},
-            "wheels": {"alloy": 200, "steel": 50},
-            "seats": {"leather": 300, "cloth": 100}
-        }
+        if seed:
+            self.seed_default_parts()
 
-    def create_connection(self, db_file):
+    @property
+    def parts(self):
+        """The whole catalog as `{type: {name: price}}`, read from the `parts` table."""
+        parts = {}
         try:
-            conn = sqlite3.connect(db_file)
-            return conn
+            for part_type, name, price in self.conn.execute(
+                    'SELECT type, name, price FROM parts ORDER BY type, name'):
+                parts.setdefault(part_type, {})[name] = price
         except sqlite3.Error as e:
-            print(f"Error connecting to database: {e}")
-            return None
+            print(f"Error reading parts: {e}")
+        return parts
+
+    @property
+    def name_index(self):
+        """The `PartNameIndex` over all parts, built from the table on first use."""
+        if self._name_index is None:
+            try:
+                self._name_index = PartNameIndex(
+                    self.conn.execute('SELECT type, name, price FROM parts'))
+            except sqlite3.Error as e:
+                print(f"Error building name index: {e}")
+                return PartNameIndex()
+        return self._name_index
+
+    @instrument("db.search_parts")
+    def search_parts(self, part_name, case_sensitive=False):
+        """Return `(type, name, price)` for every part called `part_name`, in any category."""
+        return self.name_index.lookup(part_name, case_sensitive)
+
+    @instrument("db.search_prefix")
+    def search_prefix(self, prefix, limit=20):
+        """Return up to `limit` `(type, name, price)` entries whose name starts with `prefix`."""
+        return self.name_index.prefix(prefix, limit)
+
+    @instrument("db.seed_default_parts")
+    def seed_default_parts(self):
+        """Fill an empty `parts` table with the built-in `DEFAULT_PARTS` catalog."""
+        try:
+            if self.conn.execute('SELECT 1 FROM parts LIMIT 1').fetchone() is None:
+                self.add_parts((part_type, name, price)
+                               for part_type, parts in DEFAULT_PARTS.items()
+                               for name, price in parts.items())
+        except sqlite3.Error as e:
+            print(f"Error seeding parts: {e}")
+
+    @instrument("db.create_connection")
+    def create_connection(self, db_file, pool_size=8, synchronous='NORMAL',
+                          cache_size=-64000, mmap_size=268435456):
+        """Create the pool that gives each thread its own WAL-mode connection."""
+        return ConnectionPool(db_file, size=pool_size, synchronous=synchronous,
+                              cache_size=cache_size, mmap_size=mmap_size)
+
+    @property
+    def conn(self):
+        """The calling thread's connection."""
+        return self.pool.connection()
 
+    @instrument("db.create_tables", failure_values=(None,))
     def create_tables(self):
+        """Apply the pending `parts` migrations; returns them, or None if one failed."""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS parts (
-                    id INTEGER PRIMARY KEY,
-                    type TEXT NOT NULL,
-                    name TEXT NOT NULL,
-                    price REAL NOT NULL,
-                    specs TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS inventory (
-                    id INTEGER PRIMARY KEY,
-                    part_id INTEGER,
-                    quantity INTEGER DEFAULT 0,
-                    min_quantity INTEGER DEFAULT 5,
-                    FOREIGN KEY (part_id) REFERENCES parts (id)
-                )
-            ''')
-            self.conn.commit()
+            return migrate(self.conn, "parts")
         except sqlite3.Error as e:
+            self.conn.rollback()
             print(f"Error creating tables: {e}")
+            return None
 
+    @instrument("db.add_part", failure_values=(None,))
     def add_part(self, part_type, name, price, specs=None):
         try:
             cursor = self.conn.cursor()
@@ -219,21 +329,139 @@ class CarPartDatabase(metaclass=SingletonMeta):
             ''', (part_id,))
             
             self.conn.commit()
+            self.part_cache.invalidate((part_type, name))
+            self._touch(part_type)
+            if self._name_index is not None:
+                self._name_index.add(part_type, name, price)
             return part_id
         except sqlite3.Error as e:
+            self.conn.rollback()
             print(f"Error adding part: {e}")
             return None
 
+    @instrument("db.add_parts", failure_values=(None,))
+    @profile("db.add_parts")
+    def add_parts(self, parts, chunk_size=1000):
+        """
+        Insert many parts in a single transaction.
+
+        `parts` is an iterable of `(part_type, name, price[, specs])` tuples or of dicts with
+        `type`, `name`, `price` and optional `specs` keys. Rows are streamed through
+        `executemany` in chunks of `chunk_size`, so the iterable is never materialized.
+        Returns the list of assigned part ids, or None if the transaction was rolled back.
+        """
+        part_ids = []
+        try:
+            cursor = self.conn.cursor()
+            # IMMEDIATE takes the write lock up front so the ids handed out below stay ours
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('SELECT COALESCE(MAX(id), 0) FROM parts')
+            next_id = cursor.fetchone()[0] + 1
+
+            chunk = []
+            for part in parts:
+                chunk.append((next_id,) + self._part_row(part))
+                next_id += 1
+                if len(chunk) >= chunk_size:
+                    part_ids.extend(self._insert_chunk(cursor, chunk))
+                    chunk = []
+            if chunk:
+                part_ids.extend(self._insert_chunk(cursor, chunk))
+
+            self.conn.commit()
+            return part_ids
+        except (sqlite3.Error, ValueError, TypeError, KeyError) as e:
+            self.conn.rollback()
+            # The index may hold rows of the rolled back chunks; rebuild it on next use
+            self._name_index = None
+            print(f"Error adding parts: {e}")
+            return None
+
+    def _part_row(self, part):
+        """Normalize a bulk-insert item to a `(type, name, price, specs)` row."""
+        if isinstance(part, dict):
+            part_type, name, price, specs = part['type'], part['name'], part['price'], part.get('specs')
+        else:
+            part_type, name, price, *rest = part
+            specs = rest[0] if rest else None
+        return (part_type, name, price, json.dumps(specs) if specs else None)
+
+    def _insert_chunk(self, cursor, chunk):
+        cursor.executemany('''
+            INSERT INTO parts (id, type, name, price, specs)
+            VALUES (?, ?, ?, ?, ?)
+        ''', chunk)
+        part_ids = [row[0] for row in chunk]
+        for row in chunk:
+            self.part_cache.invalidate((row[1], row[2]))
+            self._touch(row[1])
+            if self._name_index is not None:
+                self._name_index.add(row[1], row[2], row[3])
+        cursor.executemany('''
+            INSERT INTO inventory (part_id, quantity)
+            VALUES (?, 0)
+        ''', ((part_id,) for part_id in part_ids))
+        return part_ids
+
+    @instrument("db.get_part", failure_values=(None,))
     def get_part(self, part_type, part_name):
+        """Return the price of a part, reading through the `(type, name)` cache."""
+        key = (part_type, part_name)
+        part_price = self.part_cache.get(key)
+        if part_price is not None:
+            return part_price
         try:
-            part_price = self.parts.get(part_type, {}).get(part_name)
-            if part_price is None:
+            row = self.conn.execute(
+                'SELECT price FROM parts WHERE type = ? AND name = ?', key).fetchone()
+            if row is None:
                 raise ValueError(f"Part '{part_name}' of type '{part_type}' not found.")
-            return part_price
+            self.part_cache.put(key, row[0])
+            return row[0]
         except Exception as e:
             print(f"Error retrieving part: {e}")
             return None
 
+    def _touch(self, part_type):
+        # next() on the shared counter is atomic, so concurrent writers never share a version
+        self._category_versions[part_type] = next(self._version_counter)
+
+    @instrument("db.category_versions")
+    def category_versions(self):
+        """
+        `{type: version}` for every category; a category's version changes whenever one of
+        its parts is added, updated or deleted through this object.
+        """
+        return {part_type: self._category_versions.get(part_type, 0)
+                for part_type in self.part_types()}
+
+    @instrument("db.part_types")
+    def part_types(self):
+        """The distinct part categories, in order."""
+        try:
+            return [row[0] for row in self.conn.execute('SELECT DISTINCT type FROM parts ORDER BY type')]
+        except sqlite3.Error as e:
+            print(f"Error listing part types: {e}")
+            return []
+
+    def iter_by_type(self, part_type, batch_size=1000):
+        """Yield the `(name, price)` of every part of one category by name, `batch_size` rows at a time."""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT name, price FROM parts WHERE type = ? ORDER BY name', (part_type,))
+        try:
+            while True:
+                rows = _fetch_by_type(cursor, batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    @instrument("db.cache_stats")
+    def cache_stats(self):
+        """Hit, miss and eviction counters of the `get_part` cache."""
+        return self.part_cache.stats()
+
+    @instrument("db.update_part", failure_values=(False,))
     def update_part(self, part_id, price=None, specs=None):
         try:
             cursor = self.conn.cursor()
@@ -248,40 +476,152 @@ class CarPartDatabase(metaclass=SingletonMeta):
                 params.append(json.dumps(specs))
             
             if updates:
+                key = cursor.execute(
+                    'SELECT type, name FROM parts WHERE id = ?', (part_id,)).fetchone()
                 query = f"UPDATE parts SET {', '.join(updates)} WHERE id = ?"
                 params.append(part_id)
                 cursor.execute(query, params)
                 self.conn.commit()
+                if key is not None:
+                    self.part_cache.invalidate(tuple(key))
+                    self._touch(key[0])
+                    if price is not None and self._name_index is not None:
+                        self._name_index.add(key[0], key[1], price)
                 return True
             return False
         except sqlite3.Error as e:
+            self.conn.rollback()
             print(f"Error updating part: {e}")
             return False
 
+    @instrument("db.edit_part", failure_values=(False,))
+    def edit_part(self, part_name, new_price):
+        """Set the price of every part called `part_name`. Returns False if there is none."""
+        rows = self.find_by_name(part_name)
+        updated = [self.update_part(row[0], price=new_price) for row in rows]
+        return bool(updated) and all(updated)
+
+    @instrument("db.find_by_name")
+    def find_by_name(self, part_name):
+        """Return `(id, type, name, price, specs)` rows for every part with this name."""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                SELECT id, type, name, price, specs FROM parts WHERE name = ?
+            ''', (part_name,))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error finding part: {e}")
+            return []
+
+    @instrument("db.list_by_type")
+    def list_by_type(self, part_type):
+        """Return `(id, type, name, price, specs)` rows of one type, ordered by name."""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                SELECT id, type, name, price, specs FROM parts WHERE type = ? ORDER BY name
+            ''', (part_type,))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error listing parts: {e}")
+            return []
+
+    @instrument("db.count_parts")
+    def count_parts(self, name_prefix=None):
+        """Number of parts in the catalog, or of those whose name starts with `name_prefix`."""
+        where, params = self._prefix_filter(name_prefix)
+        try:
+            return self.conn.execute(f'SELECT COUNT(*) FROM parts {where}', params).fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Error counting parts: {e}")
+            return 0
+
+    @instrument("db.page_parts")
+    def page_parts(self, order_by='name', descending=False, after=None, offset=0, limit=100,
+                   name_prefix=None):
+        """
+        Return up to `limit` `(id, type, name, price)` rows sorted by `order_by`, then id.
+
+        Pass the `(order_by value, id)` of the last row already read as `after` to get the
+        next page with an index seek (keyset pagination), which costs the same on every
+        page. `offset` skips rows one by one and is meant only for jumping to a page whose
+        predecessor has not been read. `name_prefix` filters case-sensitively by name.
+        """
+        if order_by not in PAGE_COLUMNS:
+            raise ValueError(f"Cannot sort parts by {order_by!r}")
+        where, params = self._prefix_filter(name_prefix)
+        direction, op = ('DESC', '<') if descending else ('ASC', '>')
+        if after is not None:
+            where += ' AND ' if where else 'WHERE '
+            if order_by == 'id':
+                where += f'id {op} ?'
+                params.append(after[1])
+            else:
+                where += f'({order_by}, id) {op} (?, ?)'
+                params.extend(after)
+        order = f'id {direction}' if order_by == 'id' else f'{order_by} {direction}, id {direction}'
+        try:
+            return self.conn.execute(f'''
+                SELECT id, type, name, price FROM parts {where}
+                ORDER BY {order} LIMIT ? OFFSET ?
+            ''', params + [limit, offset]).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error paging parts: {e}")
+            return []
+
+    def _prefix_filter(self, name_prefix):
+        # A range on name instead of LIKE, so idx_parts_name is used
+        if not name_prefix:
+            return '', []
+        return 'WHERE name >= ? AND name < ?', [name_prefix, name_prefix + '\U0010ffff']
+
+    def iter_parts(self, batch_size=1000):
+        """
+        Yield `(id, type, name, price, specs, quantity, min_quantity)` rows of the parts and
+        inventory join, fetched `batch_size` rows at a time so the catalog is never held
+        in memory at once.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT p.id, p.type, p.name, p.price, p.specs, i.quantity, i.min_quantity
+            FROM parts p LEFT JOIN inventory i ON i.part_id = p.id
+            ORDER BY p.id
+        ''')
+        try:
+            while True:
+                rows = _fetch_parts(cursor, batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    @instrument("db.delete_part", failure_values=(False,))
     def delete_part(self, part_name):
         try:
             cursor = self.conn.cursor()
+            part_types = [row[0] for row in cursor.execute(
+                'SELECT type FROM parts WHERE name = ?', (part_name,))]
+            cursor.execute('''
+                DELETE FROM inventory WHERE part_id IN (SELECT id FROM parts WHERE name = ?)
+            ''', (part_name,))
             cursor.execute('DELETE FROM parts WHERE name = ?', (part_name,))
             self.conn.commit()
+            for part_type in part_types:
+                self.part_cache.invalidate((part_type, part_name))
+                self._touch(part_type)
+                if self._name_index is not None:
+                    self._name_index.remove(part_type, part_name)
             return cursor.rowcount > 0
         except sqlite3.Error as e:
+            self.conn.rollback()
             print(f"Error deleting part: {e}")
             return False
 
+    @instrument("db.close")
     def close(self):
-        if self.conn:
-            self.conn.close()
-
-
-class ReportManager:
-    def __init__(self):
-        self.reports = []
-
-    def generate_report(self, database):
-        report = "Car Parts Report:\n"
-        report += "\n".join([f"{name}: {info['type']} - ${info['price']}" 
-                           for name, info in database.parts.items()])
-        return report if database.parts else "No parts available."
+        self.pool.close_all()
 
 
 if __name__ == "__main__":
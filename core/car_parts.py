@@ -1,44 +1,13 @@
 # The line 'from abc import ABC, abstractmethod' is importing the 'ABC' and 'abstractmethod' classes
 # from the 'abc' module in Python.
 from abc import ABC, abstractmethod
-import copy
-import sys
-import os
-
-# Add project root to Python path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from collections import deque
 
+from utils.metrics import instrument
+from utils.profiling import profile
 from utils.singleton import SingletonMeta
 
 
-# The above class implements the Singleton design pattern in Python.
-class SingletonMeta(type):
-    """
-    The line '_instances = {}' is initializing an empty dictionary named '_instances'.
-    This dictionary is used to store instances of classes created using the Singleton design pattern.
-    The purpose of this dictionary is to keep track of instances created for each class and
-    ensure that only one instance of a class exists at any given time.
-    """
-    _instances = {}
-
-    def __call__(cls, *args, **kwargs):
-        """
-        The function is a metaclass implementation that ensures only one instance of a class is created.
-
-        :param cls: The 'cls' parameter in the code snippet you provided refers to the class itself.
-        When a class is called as a function (like 'MyClass()'), the '__call__' method is invoked, and
-        'cls' represents the class being called
-        :return: The code snippet provided is a metaclass implementation that ensures only one instance
-        of a class is created. When the class is called, it checks if an instance of that class already
-        exists in the '_instances' dictionary. If not, it creates a new instance and stores it in the
-        dictionary. Finally, it returns the instance of the class that was created or already existed.
-        """
-        if cls not in cls._instances:
-            instance = super().__call__(*args, **kwargs)
-            cls._instances[cls] = instance
-        return cls._instances[cls]
-
-
 # این کلاس یک الگوی Singleton را برای مدیریت پایگاه داده قطعات خودرو پیاده‌سازی می‌کند
 class CarPartDatabase(metaclass=SingletonMeta):
     def __init__(self):
@@ -50,13 +19,24 @@ class CarPartDatabase(metaclass=SingletonMeta):
             "wheels": {"alloy": 200, "steel": 50},  # چرخ‌ها و قیمت‌های آنها
             "seats": {"leather": 300, "cloth": 100}  # صندلی‌ها و قیمت‌های آنها
         }
+        # کلیدهایی از parts که دیکشنری آنها با یک snapshot مشترک است (copy-on-write)
+        self._shared = set()
+        # وضعیت parts در لحظه گرفتن snapshot، برای diff و merge
+        self._base = None
+
+    def _writable(self, key):
+        """Return `self.parts[key]` for writing, copying it first if a snapshot shares it."""
+        if key in self._shared:
+            self.parts[key] = dict(self.parts[key])
+            self._shared.discard(key)
+        return self.parts.setdefault(key, {})
 
     def get(self, part_type, part_name):
         """دریافت یک نمونه از قطعه بر اساس نوع و نام"""
         if part_type == "Engine":
-            return Engine(part_name)
+            return part_registry.get(Engine, part_name)
         elif part_type == "Color":
-            return Color(part_name)
+            return part_registry.get(Color, part_name)
         return None
 
     def get_part(self, part_type, part_name):
@@ -74,8 +54,14 @@ class CarPartDatabase(metaclass=SingletonMeta):
         if part_name in self.parts:
             raise ValueError("Part already exists")
         self.parts[part_name] = {'type': part_type, 'price': price}
+        self._shared.discard(part_name)
         print(f"Part '{part_name}' added with price {price}.")
 
+    def set_part(self, part_type, part_name, value):
+        """Set the price (or code) of a part in a category, creating it if needed."""
+        self._writable(part_type)[part_name] = value
+        return self
+
     def get_price(self, part_type, part_name):
         part = self.parts.get(part_name)
         if part and part['type'] == part_type:
@@ -84,7 +70,7 @@ class CarPartDatabase(metaclass=SingletonMeta):
 
     def edit_part(self, part_name, new_price):
         if part_name in self.parts:
-            self.parts[part_name]['price'] = new_price
+            self._writable(part_name)['price'] = new_price
             return True
         return False
 
@@ -103,24 +89,64 @@ class CarPartDatabase(metaclass=SingletonMeta):
         dictionary.
         """
         if part_type in self.parts and part_name in self.parts[part_type]:
-            del self.parts[part_type][part_name]
+            del self._writable(part_type)[part_name]
         return self
 
     def copy(self):
         """
-        The function 'copy' returns a deep copy of the object it is called on.
-        :return: The 'copy' method is returning a deep copy of the object 'self'. This means that a new
-        object is created with the same data as the original object, but they are independent of each
-        other.
+        Return a copy-on-write snapshot of the catalog.
+
+        The snapshot shares every category dict with this catalog. Whichever side writes to a
+        category first copies just that category, so taking a snapshot costs one entry per
+        category rather than a copy of every part. Use `diff()` to see what a snapshot
+        changed and `merge()` to apply those changes back.
+        """
+        snapshot = object.__new__(type(self))
+        snapshot.parts = dict(self.parts)
+        snapshot._base = dict(self.parts)
+        snapshot._shared = set(self.parts)
+        self._shared.update(self.parts)
+        return snapshot
+
+    def diff(self, other=None):
         """
-        return copy.deepcopy(self)
+        Return `{(key, name): (old, new)}` for every value that differs from `other`, or from
+        the catalog this snapshot was taken from. A missing value is reported as None.
+        Categories still shared between the two are skipped without being compared.
+        """
+        base = self._base if other is None else other.parts
+        if base is None:
+            return {}
+        changes = {}
+        for key in base.keys() | self.parts.keys():
+            old, new = base.get(key, {}), self.parts.get(key, {})
+            if old is new:
+                continue
+            for name in old.keys() | new.keys():
+                if old.get(name) != new.get(name):
+                    changes[(key, name)] = (old.get(name), new.get(name))
+        return changes
+
+    def merge(self, snapshot):
+        """Apply the changes made in `snapshot` to this catalog and return them."""
+        changes = snapshot.diff()
+        for (key, name), (_, new) in changes.items():
+            if new is None:
+                if key in self.parts:
+                    self._writable(key).pop(name, None)
+            else:
+                self._writable(key)[name] = new
+        return changes
 
 
 # The 'CarPart' class is an abstract base class with abstract methods 'get_price' and 'get_name' for
 # representing car parts.
 class CarPart(ABC):
     """Abstract base class for all car parts."""
-    
+
+    # Parts are created in large numbers and shared, so they carry no per-instance __dict__
+    __slots__ = ()
+
     @abstractmethod
     def get_price(self):
         """
@@ -140,14 +166,19 @@ class CarPart(ABC):
     def get_specs(self):
         pass
 
+    @classmethod
+    def catalog_spec(cls, name, value):
+        """Constructor arguments of the part stored in the catalog as `name: value`."""
+        return (value,)
+
 
 # The 'Engine' class represents a car engine with a specified power and price.
 class Engine(CarPart):
-    def __init__(self, power):
-        from .CarPartDatabase import CarPartDatabase
-        self.db = CarPartDatabase()
+    __slots__ = ("power", "price")
+
+    def __init__(self, power, price=1000):
         self.power = power
-        self.price = 1000
+        self.price = price
 
     def get_price(self):
         """
@@ -166,11 +197,19 @@ class Engine(CarPart):
     def get_specs(self):
         return f"Power: {self.power}, Price: {self.price}"
 
+    @classmethod
+    def catalog_spec(cls, name, value):
+        # The engines catalog maps each engine to its price
+        return (name, value)
+
 
 # The 'Color' class represents a car part with a code attribute and methods to get the price and name.
 class Color(CarPart):
-    def __init__(self, code):
+    __slots__ = ("code", "price")
+
+    def __init__(self, code, price=0):
         self.code = code
+        self.price = price
 
     def get_price(self):
         return self.price
@@ -182,6 +221,80 @@ class Color(CarPart):
         return f"Code: {self.code}"
 
 
+# The 'PartRegistry' class implements the Flyweight pattern: identical parts are created once and
+# shared by every car that uses them.
+class PartRegistry:
+    """
+    Shares one part instance per `(part class, spec)`, and one per catalog entry.
+
+    Shared parts must be treated as immutable. Catalog parts are kept per `(part class,
+    part type, part name)` and replaced when the entry's value changes, so price edits
+    swap the shared part instead of adding one. `resolve()` reads the current value
+    through the `get_part` cache that database writes invalidate.
+    """
+
+    def __init__(self):
+        self._parts = {}
+        self._catalog = {}
+
+    def get(self, part_class, *spec):
+        """Return the shared `part_class(*spec)` instance, creating it on first use."""
+        key = (part_class,) + spec
+        part = self._parts.get(key)
+        if part is None:
+            part = self._parts.setdefault(key, part_class(*spec))
+        return part
+
+    def catalog_part(self, part_class, part_type, part_name, value):
+        """Return the shared part for the catalog entry `(part_type, part_name)` holding `value`."""
+        spec = part_class.catalog_spec(part_name, value)
+        key = (part_class, part_type, part_name)
+        entry = self._catalog.get(key)
+        if entry is None or entry[0] != spec:
+            entry = self._catalog[key] = (spec, part_class(*spec))
+        return entry[1]
+
+    def resolve(self, part_class, part_type, part_name):
+        """Return the shared part built from the catalog entry `(part_type, part_name)`."""
+        value = _part_store().get_part(part_type, part_name)
+        if value is None:
+            self._catalog.pop((part_class, part_type, part_name), None)
+            raise ValueError(f"No part '{part_name}' of type '{part_type}' in the catalog")
+        return self.catalog_part(part_class, part_type, part_name, value)
+
+    def clear(self):
+        self._parts.clear()
+        self._catalog.clear()
+
+    def __len__(self):
+        return len(self._parts) + len(self._catalog)
+
+
+part_registry = PartRegistry()
+
+_PartStore = None
+# Database the factories read from when one was set with `set_part_store`
+_default_store = None
+
+
+def set_part_store(database):
+    """Make factories resolve parts from `database`; `None` restores the default database file."""
+    global _default_store
+    _default_store = database
+    part_registry.clear()
+
+
+def _part_store():
+    """Return the SQLite-backed CarPartDatabase, importing its module on first use only."""
+    global _PartStore
+    if _default_store is not None:
+        return _default_store
+    if _PartStore is None:
+        from .CarPartDatabase import CarPartDatabase
+        _PartStore = CarPartDatabase
+    return _PartStore()
+
+
 # The 'CarFactory' class is an abstract base class with abstract methods 'create_engine' and
 # 'create_color'.
 class CarFactory(ABC):
@@ -197,35 +310,40 @@ class CarFactory(ABC):
 # The 'SedanFactory' class creates a sedan car with a V6 engine and red color by utilizing a
 # 'CarPartDatabase'.
 class SedanFactory(CarFactory):
+    # Catalog names of the parts this factory fits, per slot (see BatchCarBuilder)
+    part_names = {"engine": "V6", "color": "red"}
+
+    @instrument("factory.sedan.create_engine")
     def create_engine(self):
-        from .CarPartDatabase import CarPartDatabase
-        return Engine(CarPartDatabase().get_part("engines", "V6"))
+        return part_registry.resolve(Engine, "engines", "V6")
 
+    @instrument("factory.sedan.create_color")
     def create_color(self):
-        from .CarPartDatabase import CarPartDatabase
-        return Color(CarPartDatabase().get_part("colors", "red"))
+        return part_registry.resolve(Color, "colors", "red")
 
 
 # The 'TruckFactory' class extends the 'CarFactory' class and overrides methods to create a specific
 # engine and color for trucks.
 class TruckFactory(CarFactory):
+    part_names = {"engine": "V8", "color": "blue"}
+
+    @instrument("factory.truck.create_engine")
     def create_engine(self):
-        from .CarPartDatabase import CarPartDatabase
-        return Engine(CarPartDatabase().get_part("engines", "V8"))
+        return part_registry.resolve(Engine, "engines", "V8")
 
+    @instrument("factory.truck.create_color")
     def create_color(self):
-        from .CarPartDatabase import CarPartDatabase
-        return Color(CarPartDatabase().get_part("colors", "blue"))
+        return part_registry.resolve(Color, "colors", "blue")
 
 
 # The 'CarBuilder' class is used to construct a car object by setting its engine using a factory.
 class CarBuilder:
     def __init__(self, factory):
         self.factory = factory
-        self.car = None
+        self.reset()
 
     def reset(self):
-        self.car = None
+        self.car = ConcreteCar()
 
     def set_engine(self):
         """
@@ -254,7 +372,24 @@ class Car:
         self.color = None
 
     def clone(self):
-        return copy.deepcopy(self)
+        """
+        Return a prototype copy of the car.
+
+        Parts are immutable flyweights, so the copy shares them with the original; only
+        car-level containers (lists, dicts, sets) are copied so the two cars can be
+        customized independently.
+        """
+        clone = self.__class__.__new__(self.__class__)
+        state = self.__dict__.copy()
+        for name, value in state.items():
+            if isinstance(value, (list, dict, set)):
+                state[name] = value.copy()
+        clone.__dict__.update(state)
+        return clone
+
+    def clone_many(self, n):
+        """Return `n` independent clones of the car."""
+        return [self.clone() for _ in range(n)]
 
 
 # Concrete Car class
@@ -268,13 +403,80 @@ class ConcreteCar(Car):
     def get_details(self):
         return f"Car with {self.engine.get_name()} and {self.color.get_name()}"
 
-    def clone(self):
-        return copy.deepcopy(self)
+
+# Part class and catalog category behind each car slot
+CAR_SLOTS = {
+    "engine": (Engine, "engines"),
+    "color": (Color, "colors"),
+}
+
+
+# The 'BuildSpec' class describes one line of an order book: which factory, how many cars and
+# which options to change.
+class BuildSpec:
+    """
+    `count` cars from `factory`, with optional `overrides`.
+
+    An override for a slot in `CAR_SLOTS` is either a catalog name (e.g. `{"engine": "V8"}`)
+    or a ready part instance; any other key is set as a plain attribute on every car.
+    """
+
+    def __init__(self, factory, count=1, overrides=None):
+        self.factory = factory
+        self.count = count
+        self.overrides = overrides or {}
+
+
+# The 'BatchCarBuilder' class assembles whole order books: parts are resolved once per batch and
+# every car is a prototype clone of a per-spec template.
+class BatchCarBuilder:
+    def __init__(self, catalog=None):
+        """`catalog` provides `get_part(type, name)`; it defaults to the parts database."""
+        self.catalog = catalog
+
+    def build(self, specs):
+        """Yield the cars for every `BuildSpec` in `specs`, one at a time."""
+        catalog = self.catalog if self.catalog is not None else _part_store()
+        resolved = {}
+        for spec in specs:
+            template = self._template(spec, catalog, resolved)
+            for _ in range(spec.count):
+                yield template.clone()
+
+    @profile("cars.build_all")
+    def build_all(self, specs):
+        return list(self.build(specs))
+
+    def _template(self, spec, catalog, resolved):
+        factory = spec.factory() if isinstance(spec.factory, type) else spec.factory
+        names = getattr(factory, "part_names", {})
+        car = ConcreteCar()
+        for slot, (part_class, part_type) in CAR_SLOTS.items():
+            choice = spec.overrides.get(slot, names.get(slot))
+            if isinstance(choice, CarPart):
+                part = choice
+            elif choice is None:
+                # Factories without catalog names still work, at one create call per batch
+                part = getattr(factory, f"create_{slot}")()
+            else:
+                key = (part_class, part_type, choice)
+                part = resolved.get(key)
+                if part is None:
+                    value = catalog.get_part(part_type, choice)
+                    if value is None:
+                        raise ValueError(f"No {slot} '{choice}' in the '{part_type}' catalog")
+                    part = resolved[key] = part_registry.catalog_part(part_class, part_type, choice, value)
+            setattr(car, slot, part)
+        for name, value in spec.overrides.items():
+            if name not in CAR_SLOTS:
+                setattr(car, name, value)
+        return car
 
 
 class ReportManager(metaclass=SingletonMeta):
-    def __init__(self):
-        self.reports = []
+    def __init__(self, capacity=1000):
+        # Ring buffer: the oldest report is dropped once `capacity` is reached
+        self.reports = deque(maxlen=capacity)
 
     def generate_report(self, car):
         report = {
@@ -286,7 +488,7 @@ class ReportManager(metaclass=SingletonMeta):
         print("Report generated:", report)
 
     def get_reports(self):
-        return self.reports
+        return list(self.reports)
 
 
 # Client code
@@ -0,0 +1,92 @@
+import sqlite3
+import threading
+
+
+class ConnectionPool:
+    """
+    Hands every thread its own SQLite connection to the same database file.
+
+    Connections are opened in WAL mode so readers never wait for a writer, and `size`
+    bounds how many threads may hold a connection at once. A thread keeps its connection
+    until it calls `release()` or the pool is closed. Note that every connection to
+    ':memory:' is a separate database, so pooled use needs a real file.
+    """
+
+    def __init__(self, db_file, size=8, synchronous='NORMAL', cache_size=-64000,
+                 mmap_size=268435456, timeout=5.0):
+        self.db_file = db_file
+        self.size = size
+        self.synchronous = synchronous
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+        self.timeout = timeout
+        self._local = threading.local()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._connections = {}
+
+    def connection(self):
+        """Return the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        if not self._slots.acquire(blocking=False):
+            self._reap()
+            if not self._slots.acquire(timeout=self.timeout):
+                raise sqlite3.OperationalError(
+                    f"Connection pool exhausted: all {self.size} connections are in use")
+        try:
+            conn = self.create_connection()
+        except sqlite3.Error:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._connections[conn] = threading.current_thread()
+        self._local.conn = conn
+        return conn
+
+    def create_connection(self):
+        """Open a connection and apply the journal and cache pragmas."""
+        # Closing happens from whichever thread shuts the pool down, so the
+        # same-thread check is relaxed; each connection is still used by one thread.
+        conn = sqlite3.connect(self.db_file, timeout=self.timeout, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={self.synchronous}')
+        conn.execute(f'PRAGMA cache_size={int(self.cache_size)}')
+        conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+        return conn
+
+    def release(self):
+        """Close the calling thread's connection and free its slot."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            owned = self._connections.pop(conn, None) is not None
+        if owned:
+            conn.close()
+            self._slots.release()
+
+    def _reap(self):
+        """Reclaim the connections of threads that exited without releasing them."""
+        with self._lock:
+            dead = [conn for conn, thread in self._connections.items() if not thread.is_alive()]
+            for conn in dead:
+                del self._connections[conn]
+        for conn in dead:
+            conn.close()
+            self._slots.release()
+
+    def close_all(self):
+        """Close every connection handed out by the pool."""
+        with self._lock:
+            connections, self._connections = self._connections, {}
+        for conn in connections:
+            conn.close()
+            self._slots.release()
+        self._local = threading.local()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._connections)
@@ -0,0 +1,147 @@
+import csv
+import gzip
+import json
+
+from utils.profiling import profile
+
+# Columns a parts CSV must provide; `specs` is optional and holds a JSON object
+REQUIRED_COLUMNS = ("type", "name", "price")
+
+# Columns written by export_parts, in the order of CarPartDatabase.iter_parts
+EXPORT_COLUMNS = ("id", "type", "name", "price", "specs", "quantity", "min_quantity")
+
+
+class ImportResult:
+    """Running totals of a CSV import, plus the first `max_errors` row errors."""
+
+    def __init__(self, max_errors=100):
+        self.max_errors = max_errors
+        self.rows_read = 0
+        self.rows_imported = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line, message))
+
+    def __str__(self):
+        summary = (f"Read {self.rows_read} rows, imported {self.rows_imported}, "
+                   f"rejected {self.error_count}.")
+        if self.errors:
+            summary += "\n" + "\n".join(f"Line {line}: {message}" for line, message in self.errors[:10])
+            if self.error_count > 10:
+                summary += f"\n... and {self.error_count - 10} more"
+        return summary
+
+
+def validate_part_row(row):
+    """Turn a CSV row into a `(type, name, price, specs)` tuple, or raise ValueError."""
+    part_type = (row.get("type") or "").strip()
+    name = (row.get("name") or "").strip()
+    if not part_type:
+        raise ValueError("type is required")
+    if not name:
+        raise ValueError("name is required")
+    try:
+        price = float(row.get("price") or "")
+    except ValueError:
+        raise ValueError(f"price {row.get('price')!r} is not a number")
+    if not price > 0:
+        raise ValueError("price must be positive")
+    specs = (row.get("specs") or "").strip()
+    if specs:
+        try:
+            specs = json.loads(specs)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"specs is not valid JSON: {e.msg}")
+        if not isinstance(specs, dict):
+            raise ValueError("specs must be a JSON object")
+    return (part_type, name, price, specs or None)
+
+
+@profile("data_io.import_parts_csv")
+def import_parts_csv(database, filename, chunk_size=1000, progress=None, max_errors=100):
+    """
+    Stream a parts CSV into `database`, validating every row.
+
+    The file is read lazily and valid rows are written with `add_parts` in transactions of
+    `chunk_size` rows, so memory use does not depend on the file size. If a chunk is
+    rejected (for example because it repeats an existing part) its rows are retried one by
+    one to find the offending ones. `progress`, if given, is called with the
+    `ImportResult` after every chunk.
+    """
+    result = ImportResult(max_errors)
+    with open(filename, newline='', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
+        missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"CSV file is missing the columns: {', '.join(missing)}")
+
+        chunk = []
+        for row in reader:
+            result.rows_read += 1
+            try:
+                chunk.append((reader.line_num, validate_part_row(row)))
+            except ValueError as e:
+                result.add_error(reader.line_num, str(e))
+            if len(chunk) >= chunk_size:
+                _store_chunk(database, chunk, result)
+                chunk = []
+                if progress:
+                    progress(result)
+        if chunk:
+            _store_chunk(database, chunk, result)
+        if progress:
+            progress(result)
+    return result
+
+
+def _store_chunk(database, chunk, result):
+    part_ids = database.add_parts((part for _, part in chunk), chunk_size=len(chunk))
+    if part_ids is not None:
+        result.rows_imported += len(part_ids)
+        return
+    for line, part in chunk:
+        if database.add_part(*part) is None:
+            result.add_error(line, f"part '{part[1]}' of type '{part[0]}' could not be stored")
+        else:
+            result.rows_imported += 1
+
+
+@profile("data_io.export_parts")
+def export_parts(database, filename, fmt=None, compress=None, batch_size=1000):
+    """
+    Stream the parts and inventory join to a CSV or JSON Lines file.
+
+    Rows come straight from a database cursor in batches of `batch_size`, so memory use
+    stays flat whatever the catalog size. `fmt` is 'csv' or 'jsonl' and `compress` turns
+    on gzip; both default from the file name (`.jsonl`, `.gz`). Returns the row count.
+    """
+    if compress is None:
+        compress = filename.endswith('.gz')
+    if fmt is None:
+        base = filename[:-3] if filename.endswith('.gz') else filename
+        fmt = 'jsonl' if base.endswith(('.jsonl', '.json')) else 'csv'
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    opener = gzip.open if compress else open
+    count = 0
+    with opener(filename, 'wt', newline='', encoding='utf-8') as file:
+        rows = database.iter_parts(batch_size)
+        if fmt == 'csv':
+            writer = csv.writer(file)
+            writer.writerow(EXPORT_COLUMNS)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                record = dict(zip(EXPORT_COLUMNS, row))
+                if record["specs"]:
+                    record["specs"] = json.loads(record["specs"])
+                file.write(json.dumps(record) + '\n')
+                count += 1
+    return count
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from utils.profiling import profile
+
+REPORT_HEADER = "=== Car Parts Inventory Report ===\n\n"
+
+
+def format_part(category, name, value):
+    if category == "colors":
+        return f"{name}: Color Code #{value}\n"
+    return f"{name}: ${value}\n"
+
+
+def iter_category_report(database, category, chunk_lines=200):
+    """
+    Yield the report section of one category as text chunks of at most `chunk_lines`
+    lines. The first chunk starts with the section heading.
+    """
+    lines = [f"\n{category.upper()}:\n", "-" * 30 + "\n"]
+    for name, value in database.iter_by_type(category):
+        lines.append(format_part(category, name, value))
+        if len(lines) >= chunk_lines:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+def report_footer(now=None):
+    now = now or datetime.now()
+    return f"\n\nReport generated on: {now.strftime('%Y-%m-%d %H:%M:%S')}"
+
+
+def iter_inventory_report(database, categories=None, chunk_lines=200):
+    """
+    Yield the full inventory report as text chunks, reading the parts table a batch at a
+    time, so neither the rows nor the text are ever held in memory as a whole.
+    """
+    yield REPORT_HEADER
+    for category in categories if categories is not None else database.part_types():
+        yield from iter_category_report(database, category, chunk_lines)
+    yield report_footer()
+
+
+@profile("inventory_report.write_report")
+def write_report(database, filename, chunk_lines=200):
+    """Stream the inventory report into `filename`. Returns the number of characters written."""
+    written = 0
+    with open(filename, 'w', encoding='utf-8') as file:
+        for chunk in iter_inventory_report(database, chunk_lines=chunk_lines):
+            written += file.write(chunk)
+    return written
@@ -0,0 +1,281 @@
+"""
+Versioned schema migrations.
+
+A database file records every migration applied to it in the `schema_version` table:
+component, version, name, when it was applied and how long it took. A component is one
+independent schema that may share a file with others (`parts`, `legacy`, `reports`), and
+`migrate(conn, component)` applies its pending migrations in version order.
+
+Each step of a migration commits on its own, so the write lock is held for one statement
+or one backfill chunk at a time, never for a whole migration. A migration is recorded
+after its last step, so steps must be safe to repeat: an interrupted migration simply
+runs again. `Backfill` rewrites a large table in rowid ranges with a commit per chunk.
+
+SQLite cannot build an index incrementally: CREATE INDEX sorts the whole table in one
+statement that holds the write lock. In WAL mode readers carry on meanwhile; writers wait
+for that one index, which is why every index is a step of its own. `ALTER TABLE ... ADD
+COLUMN` with a constant default only rewrites the schema, so new columns are cheap and
+their values are filled in afterwards with a `Backfill`.
+
+    python migrate.py car_parts.db                      # apply pending, print the log
+    python migrate.py reports.db --component reports --status
+"""
+import argparse
+import sqlite3
+import time
+from datetime import datetime
+
+SCHEMA_VERSION_TABLE = '''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        component TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        applied_at TEXT NOT NULL,
+        duration_ms REAL NOT NULL,
+        PRIMARY KEY (component, version)
+    )
+'''
+
+
+class Migration:
+    """One schema change. `steps` are SQL statements or callables taking the connection."""
+
+    def __init__(self, version, name, *steps):
+        self.version = version
+        self.name = name
+        self.steps = steps
+
+    def apply(self, conn):
+        for step in self.steps:
+            if callable(step):
+                step(conn)
+            else:
+                conn.execute(step)
+            conn.commit()
+
+
+class Backfill:
+    """
+    `UPDATE table SET assignments [WHERE where]`, run over `chunk_size` rowids at a time
+    with a commit after each chunk. `where` should exclude rows already done, so a
+    restarted backfill skips them.
+    """
+
+    def __init__(self, table, assignments, where=None, chunk_size=10000):
+        self.table = table
+        self.assignments = assignments
+        self.where = where
+        self.chunk_size = chunk_size
+
+    def __call__(self, conn):
+        low, high = conn.execute(f'SELECT MIN(rowid), MAX(rowid) FROM {self.table}').fetchone()
+        if low is None:
+            return 0
+        condition = f' AND ({self.where})' if self.where else ''
+        updated = 0
+        for start in range(low, high + 1, self.chunk_size):
+            cursor = conn.execute(f'''
+                UPDATE {self.table} SET {self.assignments}
+                WHERE rowid >= ? AND rowid < ?{condition}
+            ''', (start, start + self.chunk_size))
+            conn.commit()
+            updated += cursor.rowcount
+        return updated
+
+
+def dedupe_parts(conn):
+    """
+    Merge parts that share a `(type, name)`, which older files allowed, so the unique index
+    can be built. The lowest id, the row lookups used to return, is kept and the stock of
+    the others is added to its inventory row, or moved to it when it has none. The removed
+    parts are copied to `removed_parts` with the id they were merged into, so nothing is
+    lost. Returns the number of parts removed.
+    """
+    groups = conn.execute('''
+        SELECT MIN(id), GROUP_CONCAT(id) FROM parts GROUP BY type, name HAVING COUNT(*) > 1
+    ''').fetchall()
+    if not groups:
+        return 0
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS removed_parts (
+            id INTEGER PRIMARY KEY,
+            type TEXT NOT NULL,
+            name TEXT NOT NULL,
+            price REAL NOT NULL,
+            specs TEXT,
+            created_at TIMESTAMP,
+            merged_into INTEGER NOT NULL,
+            removed_at TEXT NOT NULL
+        )
+    ''')
+    removed = 0
+    for kept, ids in groups:
+        duplicates = [int(part_id) for part_id in ids.split(',') if int(part_id) != kept]
+        marks = ', '.join('?' * len(duplicates))
+        stock = conn.execute(f'''
+            SELECT MIN(id), COALESCE(SUM(quantity), 0) FROM inventory WHERE part_id IN ({marks})
+        ''', duplicates).fetchone()
+        target = conn.execute('SELECT MIN(id) FROM inventory WHERE part_id = ?', (kept,)).fetchone()[0]
+        if target is not None:
+            conn.execute('UPDATE inventory SET quantity = quantity + ? WHERE id = ?', (stock[1], target))
+        elif stock[0] is not None:
+            # One of the duplicates' rows becomes the kept part's row
+            conn.execute('UPDATE inventory SET part_id = ?, quantity = ? WHERE id = ?',
+                         (kept, stock[1], stock[0]))
+        conn.execute(f'DELETE FROM inventory WHERE part_id IN ({marks})', duplicates)
+        conn.execute(f'''
+            INSERT INTO removed_parts (id, type, name, price, specs, created_at, merged_into, removed_at)
+            SELECT id, type, name, price, specs, created_at, ?, ? FROM parts WHERE id IN ({marks})
+        ''', [kept, datetime.now().isoformat()] + duplicates)
+        conn.execute(f'DELETE FROM parts WHERE id IN ({marks})', duplicates)
+        removed += len(duplicates)
+    print(f"Removed {removed} duplicate parts before indexing (type, name); "
+          f"they are kept in the removed_parts table")
+    return removed
+
+
+# Columns of the reports table that query_reports can filter on
+REPORT_INDEX_COLUMNS = ("engine", "color", "price", "created_at")
+
+MIGRATIONS = {
+    # CarPartDatabase
+    "parts": [
+        Migration(1, "create parts and inventory", '''
+            CREATE TABLE IF NOT EXISTS parts (
+                id INTEGER PRIMARY KEY,
+                type TEXT NOT NULL,
+                name TEXT NOT NULL,
+                price REAL NOT NULL,
+                specs TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''', '''
+            CREATE TABLE IF NOT EXISTS inventory (
+                id INTEGER PRIMARY KEY,
+                part_id INTEGER,
+                quantity INTEGER DEFAULT 0,
+                min_quantity INTEGER DEFAULT 5,
+                FOREIGN KEY (part_id) REFERENCES parts (id)
+            )
+        '''),
+        Migration(2, "index part lookups",
+                  dedupe_parts,
+                  'CREATE UNIQUE INDEX IF NOT EXISTS idx_parts_type_name ON parts (type, name)',
+                  'CREATE INDEX IF NOT EXISTS idx_parts_name ON parts (name)',
+                  'CREATE INDEX IF NOT EXISTS idx_inventory_part_id ON inventory (part_id)'),
+        # Sort orders of page_parts; SQLite appends the id to every index entry
+        Migration(3, "index page sort columns",
+                  'CREATE INDEX IF NOT EXISTS idx_parts_type ON parts (type)',
+                  'CREATE INDEX IF NOT EXISTS idx_parts_price ON parts (price)'),
+    ],
+    # The module-level create_tables helpers of core.CarPartDatabase
+    "legacy": [
+        Migration(1, "create car_parts and engines", '''
+            CREATE TABLE IF NOT EXISTS car_parts (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                type TEXT NOT NULL
+            )
+        ''', '''
+            CREATE TABLE IF NOT EXISTS engines (
+                id INTEGER PRIMARY KEY,
+                model TEXT NOT NULL,
+                horsepower INTEGER NOT NULL
+            )
+        '''),
+    ],
+    # ReportManager and ReportWriter
+    "reports": [
+        Migration(1, "create reports", '''
+            CREATE TABLE IF NOT EXISTS reports (
+                id INTEGER PRIMARY KEY,
+                engine TEXT NOT NULL,
+                color TEXT NOT NULL,
+                price REAL NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        '''),
+        Migration(2, "index report filters",
+                  *[f'CREATE INDEX IF NOT EXISTS idx_reports_{column} ON reports ({column})'
+                    for column in REPORT_INDEX_COLUMNS]),
+    ],
+}
+
+
+def applied_versions(conn, component):
+    """Versions of `component` recorded in `schema_version`."""
+    conn.execute(SCHEMA_VERSION_TABLE)
+    return {row[0] for row in conn.execute(
+        'SELECT version FROM schema_version WHERE component = ?', (component,))}
+
+
+def current_version(conn, component):
+    return max(applied_versions(conn, component), default=0)
+
+
+def pending_migrations(conn, component, migrations=None):
+    if migrations is None:
+        migrations = MIGRATIONS[component]
+    versions = [migration.version for migration in migrations]
+    if versions != sorted(set(versions)):
+        raise ValueError(f"Migrations of {component!r} must have increasing versions")
+    applied = applied_versions(conn, component)
+    return [migration for migration in migrations if migration.version not in applied]
+
+
+def migrate(conn, component, migrations=None):
+    """
+    Apply the pending migrations of `component`, defaulting to those in `MIGRATIONS`.
+    Returns `(version, name, duration_ms)` for each migration applied.
+    """
+    applied = []
+    for migration in pending_migrations(conn, component, migrations):
+        start = time.perf_counter()
+        migration.apply(conn)
+        duration_ms = (time.perf_counter() - start) * 1000
+        # OR IGNORE: another connection may have applied the same migration meanwhile
+        conn.execute('''
+            INSERT OR IGNORE INTO schema_version (component, version, name, applied_at, duration_ms)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (component, migration.version, migration.name, datetime.now().isoformat(), duration_ms))
+        conn.commit()
+        applied.append((migration.version, migration.name, duration_ms))
+    return applied
+
+
+def migration_log(conn):
+    """Every `(component, version, name, applied_at, duration_ms)` row, in order of application."""
+    conn.execute(SCHEMA_VERSION_TABLE)
+    return conn.execute('''
+        SELECT component, version, name, applied_at, duration_ms FROM schema_version
+        ORDER BY applied_at, component, version
+    ''').fetchall()
+
+
+def format_log(rows):
+    lines = [f"{'component':<10} {'version':>7}  {'applied at':<26} {'ms':>10}  name"]
+    for component, version, name, applied_at, duration_ms in rows:
+        lines.append(f"{component:<10} {version:>7}  {applied_at:<26} {duration_ms:>10.1f}  {name}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply schema migrations to a database file")
+    parser.add_argument("db", help="SQLite database file")
+    parser.add_argument("--component", action="append", choices=sorted(MIGRATIONS),
+                        help="component to migrate (repeatable, default parts)")
+    parser.add_argument("--status", action="store_true", help="list pending migrations only")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db, timeout=30)
+    try:
+        for component in args.component or ["parts"]:
+            if args.status:
+                for migration in pending_migrations(conn, component):
+                    print(f"pending  {component} {migration.version}: {migration.name}")
+                continue
+            for version, name, duration_ms in migrate(conn, component):
+                print(f"applied  {component} {version}: {name} ({duration_ms:.1f} ms)")
+        print(format_log(migration_log(conn)))
+    finally:
+        conn.close()
@@ -0,0 +1,115 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from .car_parts import BatchCarBuilder, BuildSpec, _part_store
+
+
+class CatalogSnapshot:
+    """Read-only `{type: {name: price}}` catalog with the `get_part` lookup builders use."""
+
+    def __init__(self, parts):
+        self.parts = parts
+
+    def get_part(self, part_type, part_name):
+        return self.parts.get(part_type, {}).get(part_name)
+
+
+class PricingSummary:
+    """Car count and price totals of a pricing run."""
+
+    def __init__(self, cars=0, total=0.0, min_price=None, max_price=None):
+        self.cars = cars
+        self.total = total
+        self.min_price = min_price
+        self.max_price = max_price
+
+    @property
+    def mean(self):
+        return self.total / self.cars if self.cars else 0.0
+
+    def add(self, other):
+        if not other.cars:
+            return self
+        self.cars += other.cars
+        self.total += other.total
+        self.min_price = other.min_price if self.min_price is None else min(self.min_price, other.min_price)
+        self.max_price = other.max_price if self.max_price is None else max(self.max_price, other.max_price)
+        return self
+
+    def __repr__(self):
+        return (f"PricingSummary(cars={self.cars}, total={self.total}, "
+                f"min_price={self.min_price}, max_price={self.max_price})")
+
+
+# Catalog of the current worker process, set once by _init_worker
+_worker_catalog = None
+
+
+def _init_worker(parts):
+    global _worker_catalog
+    _worker_catalog = CatalogSnapshot(parts)
+
+
+def _price_shard(shard):
+    """Build and price one shard of an order; runs inside a worker process."""
+    factory, count, overrides, collect_reports = shard
+    builder = BatchCarBuilder(_worker_catalog)
+    summary = PricingSummary()
+    reports = [] if collect_reports else None
+    created_at = datetime.now().isoformat()
+    prices = []
+    for car in builder.build([BuildSpec(factory, count, overrides)]):
+        price = car.engine.get_price() + car.color.get_price()
+        prices.append(price)
+        if collect_reports:
+            reports.append({
+                "engine": car.engine.get_name(),
+                "color": car.color.get_name(),
+                "price": price,
+                "created_at": created_at,
+            })
+    if prices:
+        summary = PricingSummary(len(prices), sum(prices), min(prices), max(prices))
+    return summary, reports
+
+
+def _shards(specs, shard_size, collect_reports):
+    for spec in specs:
+        remaining = spec.count
+        while remaining > 0:
+            count = min(shard_size, remaining)
+            yield (spec.factory, count, spec.overrides, collect_reports)
+            remaining -= count
+
+
+def price_orders(specs, workers=None, shard_size=10000, report_manager=None, catalog=None):
+    """
+    Assemble and price every car in `specs` (a list of `BuildSpec`) across worker processes.
+
+    Orders are split into shards of at most `shard_size` cars. Every worker receives one
+    read-only snapshot of the catalog when it starts (by default the parts database as it is
+    now), so workers never touch SQLite. When `report_manager` is given, the per-car
+    reports are handed to its `add_reports` as each shard completes. `workers=0` runs
+    everything in the calling process. Returns a `PricingSummary`.
+    """
+    parts = catalog if catalog is not None else _part_store().parts
+    collect_reports = report_manager is not None
+    shards = _shards(specs, shard_size, collect_reports)
+    summary = PricingSummary()
+
+    if workers == 0:
+        _init_worker(parts)
+        results = map(_price_shard, shards)
+        for shard_summary, reports in results:
+            summary.add(shard_summary)
+            if collect_reports:
+                report_manager.add_reports(reports)
+        return summary
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(parts,)) as executor:
+        for shard_summary, reports in executor.map(_price_shard, shards):
+            summary.add(shard_summary)
+            if collect_reports:
+                report_manager.add_reports(reports)
+    return summary
@@ -0,0 +1,69 @@
+import bisect
+import threading
+
+
+class PartNameIndex:
+    """
+    In-memory reverse index from part name to `(type, name, price)` entries.
+
+    Names are folded to lower case, so an exact or case-insensitive search is a single dict
+    probe over every category. A sorted list of the folded names answers prefix searches
+    with a binary search.
+    """
+
+    def __init__(self, rows=()):
+        self._by_name = {}
+        self._sorted_names = []
+        self._lock = threading.Lock()
+        for part_type, name, price in rows:
+            self._by_name.setdefault(name.lower(), {})[(part_type, name)] = price
+        self._sorted_names = sorted(self._by_name)
+
+    def add(self, part_type, name, price):
+        """Add a part, or update its price if it is already indexed."""
+        key = name.lower()
+        with self._lock:
+            entries = self._by_name.get(key)
+            if entries is None:
+                entries = self._by_name[key] = {}
+                bisect.insort(self._sorted_names, key)
+            entries[(part_type, name)] = price
+
+    def remove(self, part_type, name):
+        key = name.lower()
+        with self._lock:
+            entries = self._by_name.get(key)
+            if entries is None:
+                return
+            entries.pop((part_type, name), None)
+            if not entries:
+                del self._by_name[key]
+                position = bisect.bisect_left(self._sorted_names, key)
+                del self._sorted_names[position]
+
+    def lookup(self, name, case_sensitive=False):
+        """Return every `(type, name, price)` entry whose name matches `name`."""
+        with self._lock:
+            entries = self._by_name.get(name.lower(), {})
+            return [(part_type, part_name, price)
+                    for (part_type, part_name), price in entries.items()
+                    if not case_sensitive or part_name == name]
+
+    def prefix(self, prefix, limit=20):
+        """Return up to `limit` entries whose name starts with `prefix`, ignoring case."""
+        key = prefix.lower()
+        matches = []
+        with self._lock:
+            position = bisect.bisect_left(self._sorted_names, key)
+            while position < len(self._sorted_names) and len(matches) < limit:
+                folded = self._sorted_names[position]
+                if not folded.startswith(key):
+                    break
+                for (part_type, part_name), price in self._by_name[folded].items():
+                    matches.append((part_type, part_name, price))
+                position += 1
+        return matches[:limit]
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(entries) for entries in self._by_name.values())
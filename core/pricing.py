@@ -0,0 +1,107 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only the vectorized pricing engine needs it
+    np = None
+
+# Car slots in column order of a configuration matrix, with the catalog type of each slot
+SLOTS = ("engine", "color", "tires", "wheels", "seats")
+SLOT_TYPES = {"engine": "engines", "color": "colors", "tires": "tires", "wheels": "wheels",
+              "seats": "seats"}
+
+
+# Catalog types whose `price` column holds something other than a price: color rows keep
+# their hex code there, which the column affinity turns into a number when it is all digits
+UNPRICED_TYPES = frozenset({"colors"})
+
+
+def _as_price(part_type, value):
+    """Price of a catalog row; rows of an `UNPRICED_TYPES` category cost nothing."""
+    if part_type in UNPRICED_TYPES:
+        return 0.0
+    return float(value)
+
+
+class PricingResult:
+    """Per-configuration totals and per-slot prices of a pricing pass."""
+
+    def __init__(self, totals, breakdown):
+        self.totals = totals
+        self.breakdown = breakdown
+
+    @property
+    def total(self):
+        return float(self.totals.sum())
+
+    @property
+    def min(self):
+        return float(self.totals.min()) if len(self.totals) else None
+
+    @property
+    def max(self):
+        return float(self.totals.max()) if len(self.totals) else None
+
+    @property
+    def mean(self):
+        return float(self.totals.mean()) if len(self.totals) else 0.0
+
+
+class PriceTable:
+    """
+    The parts catalog as NumPy arrays indexed by part id.
+
+    `price()` takes an `(N, 5)` matrix of part ids (one column per slot in `SLOTS`) and
+    prices all N configurations with a few array operations instead of N loops of method
+    calls. Part ids must exist and belong to the category of their column.
+    """
+
+    def __init__(self, rows):
+        """`rows` is an iterable of `(id, type, price)` tuples."""
+        if np is None:
+            raise ImportError("PriceTable requires NumPy: pip install numpy")
+        rows = list(rows)
+        size = max((row[0] for row in rows), default=0) + 1
+        self.prices = np.full(size, np.nan)
+        self.type_codes = np.full(size, -1, dtype=np.int16)
+        self.type_index = {}
+        for part_id, part_type, price in rows:
+            self.prices[part_id] = _as_price(part_type, price)
+            self.type_codes[part_id] = self.type_index.setdefault(part_type, len(self.type_index))
+
+    @classmethod
+    def from_database(cls, database):
+        """Load every part of a `CarPartDatabase`."""
+        return cls(database.conn.execute('SELECT id, type, price FROM parts'))
+
+    def price(self, configs):
+        """
+        Price configurations given as an `(N, len(SLOTS))` id matrix, or as a dict mapping
+        slot names to id arrays of equal length. Missing slots in a dict are priced at zero.
+        """
+        slots, ids = self._id_matrix(configs)
+        if ids.size and (ids.min() < 0 or ids.max() >= len(self.prices)):
+            raise ValueError("Configuration contains unknown part ids")
+        prices = self.prices[ids]
+        if np.isnan(prices).any():
+            raise ValueError(f"{int(np.isnan(prices).sum())} part ids are not in the catalog")
+        expected = np.array([self.type_index.get(SLOT_TYPES[slot], -2) for slot in slots],
+                            dtype=np.int16)
+        mismatched = self.type_codes[ids] != expected
+        if mismatched.any():
+            raise ValueError(f"{int(mismatched.sum())} part ids are in the wrong slot")
+        breakdown = {slot: prices[:, column] for column, slot in enumerate(slots)}
+        return PricingResult(prices.sum(axis=1), breakdown)
+
+    def _id_matrix(self, configs):
+        if isinstance(configs, dict):
+            slots = tuple(slot for slot in SLOTS if slot in configs)
+            unknown = set(configs) - set(SLOTS)
+            if unknown:
+                raise ValueError(f"Unknown slots: {', '.join(sorted(unknown))}")
+            if not slots:
+                return slots, np.zeros((0, 0), dtype=np.int64)
+            return slots, np.column_stack([np.asarray(configs[slot], dtype=np.int64)
+                                           for slot in slots])
+        ids = np.asarray(configs, dtype=np.int64)
+        if ids.ndim != 2 or ids.shape[1] != len(SLOTS):
+            raise ValueError(f"Expected an (N, {len(SLOTS)}) matrix of part ids")
+        return SLOTS, ids
@@ -0,0 +1,128 @@
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+_FLUSH = object()
+_STOP = object()
+
+# Keys every report must have, in the column order of the reports table
+REPORT_FIELDS = ("engine", "color", "price", "created_at")
+
+
+def encode_report(report):
+    """
+    Return the JSON line and table row of `report`. Raises ValueError for a report that
+    is not a dict with every key in `REPORT_FIELDS` or that cannot be serialized.
+    """
+    if not isinstance(report, dict):
+        raise ValueError(f"Report must be a dict, not {type(report).__name__}")
+    missing = [field for field in REPORT_FIELDS if field not in report]
+    if missing:
+        raise ValueError(f"Report is missing {', '.join(missing)}")
+    try:
+        line = json.dumps(report) + '\n'
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Report cannot be serialized: {e}")
+    return line, tuple(report[field] for field in REPORT_FIELDS)
+
+
+class ReportWriter:
+    """
+    Background writer that persists reports to a JSON Lines file and a SQLite table.
+
+    Reports are queued by `submit()` and written in batches once `batch_size` reports are
+    waiting or `flush_interval` seconds have passed since the first one arrived, so each
+    batch costs one file append and one commit. The queue is bounded by `max_queue`;
+    when it is full `submit()` blocks, which slows producers down to the disk's pace.
+    """
+
+    def __init__(self, db_file='reports.db', json_file='reports.json', batch_size=100,
+                 flush_interval=1.0, max_queue=10000):
+        self.db_file = db_file
+        self.json_file = json_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="ReportWriter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, report, timeout=None):
+        """
+        Queue a report, blocking for up to `timeout` seconds while the queue is full.
+        Invalid reports are rejected here with ValueError (see `encode_report`).
+        """
+        if not self._thread.is_alive():
+            raise RuntimeError("Report writer is closed")
+        self._queue.put(encode_report(report), timeout=timeout)
+
+    def flush(self):
+        """Write everything queued so far and wait until it is on disk."""
+        if self._thread.is_alive():
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self):
+        """Drain the queue, then stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        atexit.unregister(self.close)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_file)
+        try:
+            running = True
+            while running:
+                item = self._queue.get()
+                taken = 1
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item is _STOP:
+                        running = False
+                        break
+                    if item is _FLUSH:
+                        break
+                    batch.append(item)
+                    remaining = deadline - time.monotonic()
+                    if len(batch) >= self.batch_size or remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    taken += 1
+                try:
+                    self._write_batch(conn, batch)
+                finally:
+                    # Even a failed batch must be marked done, or flush() would wait forever
+                    for _ in range(taken):
+                        self._queue.task_done()
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn, batch):
+        if not batch:
+            return
+        try:
+            with open(self.json_file, 'a') as f:
+                f.writelines(line for line, _ in batch)
+            conn.executemany('''
+                INSERT INTO reports (engine, color, price, created_at) VALUES (?, ?, ?, ?)
+            ''', [row for _, row in batch])
+            conn.commit()
+            self.written += len(batch)
+        except Exception as e:
+            # Any failure costs this batch only; the writer thread keeps running
+            conn.rollback()
+            self.failed += len(batch)
+            print(f"Error writing reports: {e}")
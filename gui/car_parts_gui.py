@@ -1,11 +1,10 @@
 from tkinter import *
 from tkinter import ttk, messagebox, simpledialog, filedialog
 import tkinter as tk
-import csv
-from utils.singleton import SingletonMeta
-from core import CarPartDatabase, Engine, Color
-from core.CarPartDatabase import ReportManager
-from security.auth import UserAuthentication, InvalidCredentialsError, TokenVerificationError, UsernameAlreadyExistsError
+from gui.task_runner import TaskRunner
+from gui.virtual_tree import VirtualTreeview
+# core (SQLite) and security.auth (pyotp) are imported on first use so the window can
+# appear before they are loaded
 # from logs import LogManager
 
 
@@ -30,22 +29,108 @@ class CarPartsApp:
         self.root = root
         self.root.title("Car Parts Management System")
         
-        # Initialize components
-        self.database = CarPartDatabase()
-        self.report_manager = ReportManager()
-        self.auth = UserAuthentication()
+        # Database, report manager and authentication are created on first use
+        self._database = None
+        self._report_manager = None
+        self._auth = None
         self.log_manager = LogManager()  # Now using temporary LogManager
         self.current_user = None
+
+        # Database and report work runs on worker threads; results come back via root.after
+        self.tasks = TaskRunner(self.root)
+        self.current_task = None
         
         # Create UI
+        self.create_status_bar()
         self.create_widgets()
         
-        # Check login status at startup
-        self.check_login_status()
+        # Check login status once the window has been drawn
+        self.root.after_idle(self.check_login_status)
 
         # Bind the closing event to the on_closing method
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+    @property
+    def database(self):
+        if self._database is None:
+            from core.CarPartDatabase import CarPartDatabase
+            self._database = CarPartDatabase()
+        return self._database
+
+    @property
+    def report_manager(self):
+        if self._report_manager is None:
+            from core.CarPartDatabase import ReportManager
+            self._report_manager = ReportManager()
+        return self._report_manager
+
+    @property
+    def auth(self):
+        if self._auth is None:
+            from security.auth import UserAuthentication
+            self._auth = UserAuthentication()
+        return self._auth
+
+    def create_status_bar(self):
+        """Status line, progress bar and cancel button for background tasks"""
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side="bottom", fill="x")
+        self.status_label = ttk.Label(status_frame, text="Ready")
+        self.status_label.pack(side="left", padx=5, pady=2)
+        self.cancel_button = ttk.Button(status_frame, text="Cancel", command=self.cancel_task,
+                                        state="disabled")
+        self.cancel_button.pack(side="right", padx=5, pady=2)
+        self.progress_bar = ttk.Progressbar(status_frame, length=150, mode="determinate")
+        self.progress_bar.pack(side="right", padx=5, pady=2)
+
+    def run_task(self, description, func, *args, on_done=None, on_error=None):
+        """Run `func(task, *args)` on a worker thread while the status bar tracks it."""
+        from utils.profiling import profile
+
+        def finish(handler):
+            def callback(value):
+                self.end_task(task)
+                handler(value)
+            return callback
+
+        def show_error(e):
+            messagebox.showerror("Error", f"{description} failed: {e}")
+
+        # Sampled by the profiler when profiling is on (CARPARTS_PROFILE or main.py --profile)
+        func = profile(f"gui.{description}")(func)
+        task = self.tasks.submit(func, *args, on_done=finish(on_done or (lambda result: None)),
+                                 on_error=finish(on_error or show_error),
+                                 on_progress=self.show_progress)
+        self.current_task = task
+        self.status_label.config(text=f"{description}...")
+        self.progress_bar.config(mode="indeterminate", value=0)
+        self.progress_bar.start(50)
+        self.cancel_button.config(state="normal")
+        return task
+
+    def show_progress(self, done, total=None, message=None):
+        if total:
+            self.progress_bar.stop()
+            self.progress_bar.config(mode="determinate", maximum=total, value=done)
+        if message:
+            self.status_label.config(text=message)
+
+    def end_task(self, task, status="Ready"):
+        """Reset the status bar if `task` is the one it is showing."""
+        if task is not self.current_task:
+            return
+        self.current_task = None
+        self.progress_bar.stop()
+        self.progress_bar.config(mode="determinate", value=0)
+        self.status_label.config(text=status)
+        self.cancel_button.config(state="disabled")
+
+    def cancel_task(self):
+        task = self.current_task
+        if task is not None:
+            task.cancel()
+            self.end_task(task, "Cancelled")
+
     def create_widgets(self):
         # Create main container frame
         container = ttk.Frame(self.root)
@@ -135,6 +220,8 @@ class CarPartsApp:
             ("Search Part", self.get_price),
             ("Generate Report", self.generate_report),
             ("View Database", self.view_database),
+            ("Import CSV", self.import_data),
+            ("Export Data", self.export_data),
             ("Help", self.show_help),
             ("Clear All Logs", self.clear_all_logs)
         ]
@@ -176,13 +263,21 @@ class CarPartsApp:
 
         try:
             price = float(price)
-            self.database.add_part(part_type, part_name, price)
-            messagebox.showinfo("Success", f"Part '{part_name}' added successfully!")
-            self.part_type_entry.delete(0, ttk.END)
-            self.part_name_entry.delete(0, ttk.END)
-            self.price_entry.delete(0, ttk.END)
         except ValueError:
             messagebox.showerror("Input Error", "Price must be a number!")
+            return
+
+        def added(part_id):
+            if part_id is None:
+                messagebox.showerror("Error", f"Part '{part_name}' could not be added.")
+                return
+            messagebox.showinfo("Success", f"Part '{part_name}' added successfully!")
+            self.part_type_entry.delete(0, END)
+            self.part_name_entry.delete(0, END)
+            self.price_entry.delete(0, END)
+
+        self.run_task("Adding part", lambda task: self.database.add_part(part_type, part_name, price),
+                      on_done=added)
 
     def get_price(self):
         """Search for a part and display its details"""
@@ -191,17 +286,28 @@ class CarPartsApp:
             messagebox.showerror("Error", "Please enter a part name")
             return
 
-        # Try to find in different categories
-        for part_type in ["engines", "colors", "tires", "wheels", "seats"]:
-            price = self.database.get_part(part_type, part_name)
-            if price is not None:
-                specs = f"Type: {part_type}\nName: {part_name}\nPrice: ${price}"
+        def search(task):
+            # One probe of the name index covers every category
+            matches = self.database.search_parts(part_name)
+            return matches, [] if matches else self.database.search_prefix(part_name, limit=5)
+
+        self.run_task("Searching", search, on_done=lambda result: self.show_part_details(part_name, *result))
+
+    def show_part_details(self, part_name, matches, suggestions):
+        if matches:
+            details = []
+            for part_type, name, price in matches:
+                specs = f"Type: {part_type}\nName: {name}\nPrice: ${price}"
                 if part_type == "colors":
                     specs += f"\nColor Code: #{price}"
-                messagebox.showinfo("Part Details", specs)
-                return
-        
-        messagebox.showerror("Not Found", f"Part '{part_name}' not found in any category")
+                details.append(specs)
+            messagebox.showinfo("Part Details", "\n\n".join(details))
+            return
+
+        message = f"Part '{part_name}' not found in any category"
+        if suggestions:
+            message += "\n\nDid you mean: " + ", ".join(name for _, name, _ in suggestions)
+        messagebox.showerror("Not Found", message)
 
     def get_registration_logs(self):
         # Implement this method to return registration logs
@@ -214,21 +320,27 @@ class CarPartsApp:
             new_price = simpledialog.askfloat(
                 "Edit Price", "Enter new price:")
             if new_price is not None:
-                success = self.database.edit_part(part_name, new_price)
-                if success:
-                    messagebox.showinfo("Success", f"Part '{part_name}' updated successfully!")
-                else:
-                    messagebox.showerror("Not Found", f"Part '{part_name}' not found.")
+                def edited(success):
+                    if success:
+                        messagebox.showinfo("Success", f"Part '{part_name}' updated successfully!")
+                    else:
+                        messagebox.showerror("Not Found", f"Part '{part_name}' not found.")
+
+                self.run_task("Editing part", lambda task: self.database.edit_part(part_name, new_price),
+                              on_done=edited)
 
     def delete_part(self):
         part_name = simpledialog.askstring(
             "Delete Part", "Enter part name:")
         if part_name:
-            success = self.database.delete_part(part_name)
-            if success:
-                messagebox.showinfo("Success", f"Part '{part_name}' deleted successfully!")
-            else:
-                messagebox.showerror("Not Found", f"Part '{part_name}' not found.")
+            def deleted(success):
+                if success:
+                    messagebox.showinfo("Success", f"Part '{part_name}' deleted successfully!")
+                else:
+                    messagebox.showerror("Not Found", f"Part '{part_name}' not found.")
+
+            self.run_task("Deleting part", lambda task: self.database.delete_part(part_name),
+                          on_done=deleted)
 
     def show_logs(self):
         # Create and center new window
@@ -268,26 +380,78 @@ class CarPartsApp:
         scrollbar.pack(side=RIGHT, fill=Y)
         report_text.configure(yscrollcommand=scrollbar.set)
 
-        # Generate report content
-        report_content = "=== Car Parts Inventory Report ===\n\n"
-        
-        for category, parts in self.database.parts.items():
-            report_content += f"\n{category.upper()}:\n"
-            report_content += "-" * 30 + "\n"
-            for name, value in parts.items():
-                if category == "colors":
-                    report_content += f"{name}: Color Code #{value}\n"
-                else:
-                    report_content += f"{name}: ${value}\n"
+        from core.inventory_report import (REPORT_HEADER, iter_category_report, report_footer,
+                                           write_report)
 
-        # Add timestamp
-        from datetime import datetime
-        report_content += f"\n\nReport generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-
-        # Insert report content
-        report_text.insert(END, report_content)
+        report_text.insert(END, REPORT_HEADER, "header")
         report_text.config(state=DISABLED)  # Make read-only
 
+        # Each category's text carries the tag "category:<name>", so a refresh can replace
+        # just the sections whose version changed since they were rendered
+        rendered = {}
+        section_start = {}
+        current = []
+
+        def edit(action, *args):
+            report_text.config(state=NORMAL)
+            action(*args)
+            report_text.config(state=DISABLED)
+
+        def remove_section(category):
+            ranges = report_text.tag_ranges(f"category:{category}")
+            if ranges:
+                edit(report_text.delete, ranges[0], ranges[-1])
+
+        def begin_section(category):
+            ranges = report_text.tag_ranges(f"category:{category}")
+            if ranges:
+                section_start[category] = report_text.index(ranges[0])
+                edit(report_text.delete, ranges[0], ranges[-1])
+            elif report_text.tag_ranges("footer"):
+                section_start[category] = report_text.index("footer.first")
+            else:
+                section_start[category] = report_text.index("end-1c")
+
+        def append(category, chunk):
+            tag = f"category:{category}"
+            ranges = report_text.tag_ranges(tag)
+            edit(report_text.insert, ranges[-1] if ranges else section_start[category], chunk, tag)
+
+        def set_footer(footer):
+            ranges = report_text.tag_ranges("footer")
+            if ranges:
+                edit(report_text.delete, ranges[0], ranges[-1])
+            edit(report_text.insert, END, footer, "footer")
+
+        def render(task, previous):
+            versions = self.database.category_versions()
+            changed = [category for category, version in versions.items()
+                       if previous.get(category) != version]
+            removed = [category for category in previous if category not in versions]
+            for category in removed:
+                task.post(remove_section, category)
+            for done, category in enumerate(changed, 1):
+                task.check()
+                task.post(begin_section, category)
+                for chunk in iter_category_report(self.database, category):
+                    task.check()
+                    task.post(append, category, chunk)
+                task.report_progress(done, len(changed), f"Report: {category}")
+            if changed or removed or not previous:
+                task.post(set_footer, report_footer())
+            return versions
+
+        def rendered_up_to(versions):
+            rendered.clear()
+            rendered.update(versions)
+
+        def refresh():
+            if current and not current[-1].finished:
+                return
+            task = self.run_task("Generating report", render, dict(rendered), on_done=rendered_up_to)
+            current.append(task)
+            self.cancel_with_window(report_window, task)
+
         # Add export button
         def export_report():
             file_path = filedialog.asksaveasfilename(
@@ -295,11 +459,25 @@ class CarPartsApp:
                 filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
             )
             if file_path:
-                with open(file_path, 'w') as file:
-                    file.write(report_content)
-                messagebox.showinfo("Success", "Report exported successfully!")
-
-        ttk.Button(report_window, text="Export Report", command=export_report).pack(pady=10)
+                # Streamed from the database straight to disk
+                self.run_task("Exporting report", lambda task: write_report(self.database, file_path),
+                              on_done=lambda written: messagebox.showinfo(
+                                  "Success", "Report exported successfully!"))
+
+        button_frame = ttk.Frame(report_window)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Refresh", command=refresh).pack(side=LEFT, padx=5)
+        ttk.Button(button_frame, text="Export Report", command=export_report).pack(side=LEFT, padx=5)
+
+        refresh()
+
+    def cancel_with_window(self, window, task):
+        """Cancel `task` if `window` is closed before it finishes."""
+        def on_destroy(event):
+            if event.widget is window and not task.finished:
+                task.cancel()
+                self.end_task(task, "Cancelled")
+        window.bind("<Destroy>", on_destroy, add="+")
 
     def show_help(self):
         """Display help information"""
@@ -370,24 +548,57 @@ Version: 1.0.0
         container.pack(fill="both", expand=True)
         container.grid_columnconfigure(0, weight=1)
 
-        # Create centered treeview
-        tree = ttk.Treeview(container, columns=("Type", "Name", "Price"), show="headings")
-        
-        # Configure columns
-        for col in ("Type", "Name", "Price"):
-            tree.heading(col, text=col, anchor="center")
-            tree.column(col, anchor="center", width=150)
+        # Name filter, applied once typing pauses
+        filter_frame = ttk.Frame(container)
+        filter_frame.pack(fill="x", padx=20, pady=(10, 0))
+        ttk.Label(filter_frame, text="Filter by name:").pack(side="left", padx=5)
+        filter_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=filter_var).pack(side="left", fill="x", expand=True)
+
+        # Only the visible rows are read from the database, a page at a time on the task
+        # workers; clicking a heading sorts in SQLite. The database is looked up on the
+        # worker too, since the first lookup opens and migrates it.
+        grid = VirtualTreeview(container, [("type", "Type"), ("name", "Name"), ("price", "Price")],
+                               lambda *args: self.database.page_parts(*args),
+                               lambda name_prefix: self.database.count_parts(name_prefix),
+                               self.tasks)
+        grid.pack(fill="both", expand=True, padx=20, pady=10)
+
+        pending_filter = []
+
+        def apply_filter():
+            pending_filter.clear()
+            grid.set_filter(filter_var.get())
 
-        tree.pack(fill="both", expand=True, padx=20, pady=10)
+        def on_filter_change(*args):
+            if pending_filter:
+                view_window.after_cancel(pending_filter.pop())
+            pending_filter.append(view_window.after(250, apply_filter))
+
+        filter_var.trace_add("write", on_filter_change)
 
         # Add centered close button
         close_button = ttk.Button(container, text="Close", command=view_window.destroy)
         close_button.pack(pady=10)
 
     def export_data(self):
-        filename = DataExporter.export_to_csv(self.database)
-        messagebox.showinfo("خروج به CSV موفق",
-                            f"دیتا با موفقیت به فایل {filename} خروج داده شد.")
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("JSON Lines", "*.jsonl"),
+                       ("Compressed", "*.gz"), ("All files", "*.*")]
+        )
+        if filename:
+            from core.data_io import export_parts
+
+            def exported(count):
+                messagebox.showinfo("Success", f"Exported {count} parts to {filename}.")
+
+            def failed(e):
+                messagebox.showerror(
+                    "Export Error", f"An error occurred while exporting data: {str(e)}")
+
+            self.run_task("Exporting", lambda task: export_parts(self.database, filename),
+                          on_done=exported, on_error=failed)
 
     def import_data(self):
         # Open a file dialog to select a CSV file
@@ -397,8 +608,25 @@ Version: 1.0.0
         )
 
         if filename:  # Check if a file was selected
-            result = DataImporter.import_from_csv(self.database, filename)
-            messagebox.showinfo("نتیجه وارد کردن", result)
+            from core.data_io import import_parts_csv
+
+            def run(task):
+                def progress(result):
+                    task.check()
+                    task.report_progress(result.rows_read, None,
+                                         f"Imported {result.rows_imported} of {result.rows_read} rows")
+                return import_parts_csv(self.database, filename, progress=progress)
+
+            def failed(e):
+                if isinstance(e, FileNotFoundError):
+                    messagebox.showerror(
+                        "Import Error", "The specified file was not found.")
+                else:
+                    messagebox.showerror(
+                        "Import Error", f"An error occurred while importing data: {str(e)}")
+
+            self.run_task("Importing", run, on_error=failed,
+                          on_done=lambda result: messagebox.showinfo("Import Finished", str(result)))
         else:
             messagebox.showwarning(
                 "فایل انتخاب نشده", "لطفا یک فایل برای وارد کردن انتخاب کنید.")
@@ -406,6 +634,7 @@ Version: 1.0.0
     def register_user(self):
         username = self.username_entry.get()
         password = self.password_entry.get()
+        from security.auth import UsernameAlreadyExistsError
         try:
             message = self.auth.register(username, password)
             messagebox.showinfo("ثبت‌نام موفق", message)
@@ -416,6 +645,7 @@ Version: 1.0.0
         """مدیریت ورود کاربر"""
         username = self.username_entry.get()
         password = self.password_entry.get()
+        from security.auth import InvalidCredentialsError, TokenVerificationError
         try:
             token = self.auth.login(username, password)
             if token:
@@ -466,6 +696,10 @@ Version: 1.0.0
     def on_closing(self):
         """Handle the closing event of the application."""
         if messagebox.askokcancel("Quit", "Do you want to quit?"):
+            self.tasks.shutdown()
+            # Drain queued reports before the process goes away
+            if self._report_manager is not None:
+                self._report_manager.close()
             self.root.destroy()
 
     def show_registration_logs(self):
@@ -546,91 +780,6 @@ class Inventory:
             return False
 
 
-class CarPartDatabase(metaclass=SingletonMeta):
-    def __init__(self):
-        # Dictionary to store different types of parts and their prices
-        self.parts = {
-            "engines": {"V8": 500, "V6": 300},  # Engines and their prices
-            "colors": {"red": "FF0000", "blue": "0000FF"},  # Colors and their codes
-            "tires": {"Pirelli": 100, "Michelin": 150},  # Tires and their prices
-            "wheels": {"alloy": 200, "steel": 50},  # Wheels and their prices
-            "seats": {"leather": 300, "cloth": 100}  # Seats and their prices
-        }
-
-    def get(self, part_type, part_name):
-        """Get a part instance based on type and name"""
-        if part_type == "Engine":
-            return Engine(part_name)
-        elif part_type == "Color":
-            return Color(part_name)
-        return None
-
-    def get_part(self, part_type, part_name):
-        """Get part price based on type and name"""
-        try:
-            part_price = self.parts.get(part_type, {}).get(part_name)
-            if part_price is None:
-                raise ValueError(f"Part '{part_name}' of type '{part_type}' not found.")
-            return part_price
-        except Exception as e:
-            print(f"Error retrieving part: {e}")
-            return None
-
-
-class DataExporter:
-    def export_to_csv(self, data, filename):
-        """Export data to a CSV file."""
-        try:
-            with open(filename, mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerows(data)
-            messagebox.showinfo("Success", "Data exported successfully!")
-        except Exception as e:
-            messagebox.showerror(
-                "Export Error", f"An error occurred while exporting data: {str(e)}")
-
-
-class DataImporter:
-    def import_from_csv(self, filename):
-        """Import data from a CSV file."""
-        try:
-            with open(filename, mode='r') as file:
-                reader = csv.reader(file)
-                data = [row for row in reader]
-            messagebox.showinfo("Success", "Data imported successfully!")
-            return data
-        except FileNotFoundError:
-            messagebox.showerror(
-                "Import Error", "The specified file was not found.")
-        except Exception as e:
-            messagebox.showerror(
-                "Import Error", f"An error occurred while importing data: {str(e)}")
-
-    def login(self):
-        username = self.username_entry.get()
-        password = self.password_entry.get()
-
-        if self.validate_login(username, password):
-            messagebox.showinfo("Login Successful", f"Welcome, {username}!")
-            self.destroy()
-        else:
-            messagebox.showerror(
-                "Login Failed", "Invalid username or password.")
-
-    def validate_login(self, username, password):
-        return True
-
-    def on_close(self):
-        self.destroy()
-
-
-class ReportManager:
-    def generate_report(self, database):
-        report = "Car Parts Report:\n"
-        report += "\n".join([f"{name}: {info['type']} - ${info['price']}"] for name, info in database.parts.items())
-        return report if database.parts else "No parts available."
-
-
 def main():
     root = Tk()
     app = CarPartsApp(root)
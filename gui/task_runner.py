@@ -0,0 +1,139 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task by `Task.check()` once the task has been cancelled."""
+    pass
+
+
+class Task:
+    """
+    Handle to a function running on a `TaskRunner` worker thread.
+
+    The function receives the task as its first argument. It should call `check()`
+    between steps so `cancel()` takes effect, and may call `report_progress()` or `post()`
+    to send work back to the Tk thread.
+    """
+
+    def __init__(self, runner, on_done=None, on_error=None, on_progress=None):
+        self._runner = runner
+        self._cancelled = threading.Event()
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.finished = False
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise TaskCancelled()
+
+    def post(self, callback, *args):
+        """Run `callback(*args)` on the Tk thread, unless the task is cancelled by then."""
+        self._runner._post(self, callback, args)
+
+    def report_progress(self, done, total=None, message=None):
+        if self.on_progress is not None:
+            self.post(self.on_progress, done, total, message)
+
+
+class TaskRunner:
+    """
+    Runs blocking work on a thread pool and delivers results to Tk.
+
+    Worker threads never touch widgets: everything they produce goes through a queue that
+    the Tk thread drains every `poll_interval` milliseconds while tasks are active. Each
+    tick stops handling messages after `budget` milliseconds, so with the defaults a
+    chatty task leaves the event loop enough of every 16 ms frame to keep up with 60 fps.
+    """
+
+    def __init__(self, root, max_workers=2, poll_interval=16, budget=8):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.budget = budget
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gui-task")
+        self._messages = queue.Queue()
+        self._active = set()
+        self._polling = False
+
+    def submit(self, func, *args, on_done=None, on_error=None, on_progress=None):
+        """
+        Run `func(task, *args)` on a worker. `on_done(result)` or `on_error(exception)` is
+        then called on the Tk thread; neither is called for a cancelled task.
+        """
+        task = Task(self, on_done, on_error, on_progress)
+        self._active.add(task)
+        self._executor.submit(self._run, task, func, args)
+        self._schedule_poll()
+        return task
+
+    def cancel_all(self):
+        for task in list(self._active):
+            task.cancel()
+
+    def shutdown(self):
+        """Cancel every task and stop the workers without waiting for them."""
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __len__(self):
+        return len(self._active)
+
+    def _run(self, task, func, args):
+        try:
+            task.check()
+            result = func(task, *args)
+        except TaskCancelled:
+            self._messages.put((task, self._finish, (task,)))
+        except Exception as e:
+            self._messages.put((task, self._finish, (task, None, e)))
+        else:
+            self._messages.put((task, self._finish, (task, result)))
+
+    def _post(self, task, callback, args):
+        self._messages.put((task, callback, args))
+
+    def _finish(self, task, result=None, error=None):
+        task.finished = True
+        self._active.discard(task)
+        if task.cancelled:
+            return
+        if error is not None:
+            if task.on_error is not None:
+                task.on_error(error)
+            else:
+                print(f"Error in background task: {error}")
+        elif task.on_done is not None:
+            task.on_done(result)
+
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        deadline = time.monotonic() + self.budget / 1000
+        while time.monotonic() < deadline:
+            try:
+                task, callback, args = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            # Completion always runs so the task leaves the active set; other messages of a
+            # cancelled task are dropped
+            if callback == self._finish or not task.cancelled:
+                try:
+                    callback(*args)
+                except Exception as e:
+                    print(f"Error handling task result: {e}")
+        if self._active or not self._messages.empty():
+            self._schedule_poll()
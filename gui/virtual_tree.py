@@ -0,0 +1,205 @@
+import bisect
+import threading
+from collections import OrderedDict
+from tkinter import ttk
+
+
+class PagedRows:
+    """
+    Random access to a sorted result set that is read a page at a time.
+
+    `fetch_page(order_by, descending, after, offset, limit, name_prefix)` returns rows whose
+    first item is the id (see `CarPartDatabase.page_parts`); `count(name_prefix)` sizes
+    the result when `total` is first read. Reading page n remembers the `(sort value, id)`
+    key of its last row, so page n + 1 is fetched with a keyset seek. A page past the last
+    known key is reached from the nearest one before it with an offset, once. At most
+    `max_pages` pages are kept in memory. Nothing is read on construction or `reset()`.
+    """
+
+    def __init__(self, fetch_page, count, columns, order_by=None, page_size=100, max_pages=50):
+        self.fetch_page = fetch_page
+        self.count = count
+        self.columns = columns
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.order_by = order_by or columns[0]
+        self.descending = False
+        self.name_prefix = None
+        self.reset()
+
+    def reset(self, order_by=None, descending=None, name_prefix=None):
+        """Change the sort or filter (keeping the current one where `None`) and drop all pages."""
+        if order_by is not None:
+            self.order_by = order_by
+        if descending is not None:
+            self.descending = descending
+        if name_prefix is not None:
+            self.name_prefix = name_prefix or None
+        self._pages = OrderedDict()
+        # Page number -> key of the last row before it; page 0 needs none
+        self._anchors = {0: None}
+        self._anchor_pages = [0]
+        self._total = None
+
+    @property
+    def total(self):
+        if self._total is None:
+            self._total = self.count(self.name_prefix)
+        return self._total
+
+    def rows(self, start, count):
+        """Rows `start` to `start + count` of the result."""
+        start = max(0, start)
+        end = min(start + count, self.total)
+        rows = []
+        for page in range(start // self.page_size, (end - 1) // self.page_size + 1):
+            base = page * self.page_size
+            rows.extend(self._page(page)[max(start - base, 0):end - base])
+        return rows
+
+    def _page(self, page):
+        rows = self._pages.get(page)
+        if rows is not None:
+            self._pages.move_to_end(page)
+            return rows
+        # Seek to the closest known key at or before this page, then skip the remainder
+        nearest = self._anchor_pages[bisect.bisect_right(self._anchor_pages, page) - 1]
+        rows = self.fetch_page(self.order_by, self.descending, self._anchors[nearest],
+                               (page - nearest) * self.page_size, self.page_size,
+                               self.name_prefix)
+        if len(rows) == self.page_size and page + 1 not in self._anchors:
+            sort_index = self.columns.index(self.order_by)
+            self._anchors[page + 1] = (rows[-1][sort_index], rows[-1][0])
+            bisect.insort(self._anchor_pages, page + 1)
+        self._pages[page] = rows
+        if len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return rows
+
+
+class VirtualTreeview(ttk.Frame):
+    """
+    Treeview over a result set of any size.
+
+    Only the rows that fit in the widget exist as Tk items; scrolling replaces them with
+    rows read through a `PagedRows`. Clicking a heading sorts by that column in the
+    database and `set_filter()` restricts the rows to a name prefix. `columns` are the
+    `(key, title)` pairs to show; rows from `fetch_page` start with the id, followed by
+    these columns.
+
+    Counts and pages are read on the workers of `tasks`, a `TaskRunner`, and the rows are
+    drawn when they arrive. A newer scroll, sort or filter cancels a read still pending.
+    """
+
+    def __init__(self, master, columns, fetch_page, count, tasks, page_size=100, row_height=20,
+                 **kwargs):
+        super().__init__(master, **kwargs)
+        self.titles = dict(columns)
+        keys = [key for key, _ in columns]
+        self.data = PagedRows(fetch_page, count, ["id"] + keys, order_by=keys[0], page_size=page_size)
+        self.tasks = tasks
+        self.row_height = row_height
+        self.visible = 20
+        self.top = 0
+        self.total = 0
+        # The query the view shows; `generation` changes on refresh() to force a re-read
+        self.order_by = keys[0]
+        self.descending = False
+        self.name_prefix = None
+        self.generation = 0
+        # Only read by workers, under `_lock`: the query `data` was last reset for
+        self._data_query = None
+        self._lock = threading.Lock()
+        self._loading = None
+
+        self.tree = ttk.Treeview(self, columns=keys, show="headings", selectmode="browse")
+        for key in keys:
+            self.tree.heading(key, anchor="center", command=lambda key=key: self.sort_by(key))
+            self.tree.column(key, anchor="center", width=150)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1, "units"))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-1, "pages"))
+        self.tree.bind("<Next>", lambda e: self.scroll(1, "pages"))
+        self.bind("<Destroy>", self.on_destroy)
+        self.update_headings()
+        self.load()
+
+    def sort_by(self, key):
+        """Sort by `key`, toggling the direction when it is already the sort column."""
+        self.descending = not self.descending if key == self.order_by else False
+        self.order_by = key
+        self.top = 0
+        self.update_headings()
+        self.load()
+
+    def set_filter(self, name_prefix):
+        self.name_prefix = name_prefix or None
+        self.top = 0
+        self.load()
+
+    def refresh(self):
+        """Re-read the rows, e.g. after the table changed."""
+        self.generation += 1
+        self.load()
+
+    def update_headings(self):
+        for key, title in self.titles.items():
+            if key == self.order_by:
+                title += " ▼" if self.descending else " ▲"
+            self.tree.heading(key, text=title)
+
+    def on_resize(self, event):
+        # The heading takes about one row
+        visible = max(1, event.height // self.row_height - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.load()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.top = int(float(amount) * self.total)
+            self.load()
+        else:
+            self.scroll(int(amount), unit)
+
+    def scroll(self, amount, unit):
+        self.top += amount * (self.visible if unit == "pages" else 1)
+        self.load()
+        return "break"
+
+    def on_destroy(self, event):
+        if event.widget is self and self._loading is not None:
+            self._loading.cancel()
+
+    def load(self):
+        """Read the rows at `top` on a worker and render them once they arrive."""
+        if self._loading is not None:
+            self._loading.cancel()
+        query = (self.order_by, self.descending, self.name_prefix, self.generation)
+        self._loading = self.tasks.submit(self.read, query, self.top, self.visible, on_done=self.render)
+
+    def read(self, task, query, top, visible):
+        """Worker side of `load()`: returns `(top, total, rows)`, with `top` clamped to the result."""
+        with self._lock:
+            task.check()
+            if query != self._data_query:
+                order_by, descending, name_prefix, _ = query
+                self.data.reset(order_by, descending, name_prefix or "")
+                self._data_query = query
+            top = max(0, min(top, self.data.total - visible))
+            return top, self.data.total, self.data.rows(top, visible)
+
+    def render(self, result):
+        self._loading = None
+        self.top, self.total, rows = result
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            self.tree.insert("", "end", iid=str(row[0]), values=row[1:])
+        total = max(self.total, 1)
+        self.scrollbar.set(self.top / total, (self.top + len(rows)) / total)
@@ -41,4 +41,5 @@ class CarPartsUser(HttpUser):
         response = self.client.get("/generate_report")
         print("Generate Report Response:", response.text)
 
+# Start the service with: python -m service.server --port 8000
 # Run with: locust -f locustfile.py --host=http://localhost:8000
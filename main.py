@@ -1,20 +1,38 @@
-from tkinter import Tk
-from gui.car_parts_gui import CarPartsApp
-from core import CarPartDatabase, Engine, Color
-from security.auth import UserAuthentication
 # from logs import LogManager, PartLogManager, UserLogManager
 
 
-def main():
+def main(argv=None):
     """
     Main entry point of the Car Parts Management System.
     Initializes and runs the GUI application.
     """
+    args = parse_args(argv)
+    if args.profile is not None:
+        from utils.profiling import parse_rate, profiler
+        profiler.configure(sample_rate=parse_rate(args.profile), output_dir=args.profile_dir)
+        print(f"Profiling {profiler.sample_rate:.0%} of calls into {profiler.output_dir}")
+
+    # Imported here so `import main` stays cheap; the GUI itself loads the database and
+    # authentication modules on first use
+    from tkinter import Tk
+    from gui.car_parts_gui import CarPartsApp
+
     root = Tk()
     app = CarPartsApp(root)
     root.minsize(500, 400)
     root.mainloop()
 
 
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Car Parts Management System")
+    parser.add_argument("--profile", nargs="?", const="1", metavar="RATE",
+                        help="profile entry points with cProfile and tracemalloc; RATE is the "
+                             "fraction of calls to profile (default 1, overrides CARPARTS_PROFILE)")
+    parser.add_argument("--profile-dir", help="where profiles are written (default profiles)")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,11 @@
+"""
+Apply schema migrations to a database file and print its migration log.
+
+    python migrate.py car_parts.db
+    python migrate.py reports.db --component reports --status
+"""
+from core.migrations import main
+
+
+if __name__ == "__main__":
+    main()
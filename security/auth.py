@@ -1,6 +1,8 @@
 import pyotp
 from tkinter import messagebox, simpledialog
 
+from utils.metrics import instrument
+
 
 class AuthenticationError(Exception):
     """Base class for authentication errors"""
@@ -34,6 +36,7 @@ class UserAuthentication:
         self.user_database[username] = (password, secret)
         return "Registration successful"
 
+    @instrument("auth.login")
     def login(self, username, password):
         if username not in self.user_database:
             raise InvalidCredentialsError("Invalid username or password")
@@ -45,6 +48,7 @@ class UserAuthentication:
         totp = pyotp.TOTP(secret)
         return totp.now()
 
+    @instrument("auth.verify_token")
     def verify_token(self, username, entered_token):
         """Verify the 2FA token."""
         if username in self.user_database:
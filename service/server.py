@@ -0,0 +1,304 @@
+"""
+Asyncio HTTP front end for the parts database.
+
+Serves the endpoints exercised by `load_tests/locustfile.py`:
+
+    POST   /add_part         {"part_type", "part_name", "price"[, "specs"]}
+    GET    /get_price        ?part_name=...
+    PUT    /edit_part        {"part_name", "new_price"}
+    DELETE /delete_part      ?part_name=...
+    GET    /generate_report  inventory report as text, streamed in chunks
+    GET    /metrics          call metrics as Prometheus text, or JSON with ?format=json
+
+Run with `python -m service.server --port 8000`. Blocking SQLite calls run on a thread
+pool so the event loop only parses requests and writes responses; report streams read
+on a pool of their own so slow clients cannot hold up other requests.
+"""
+import argparse
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from core.CarPartDatabase import CarPartDatabase
+from core.inventory_report import iter_inventory_report
+from utils.metrics import registry
+
+
+class HTTPError(Exception):
+    """An error response with a status code."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class CarPartsService:
+    """
+    HTTP/1.1 server with keep-alive over a `CarPartDatabase`.
+
+    Every database call goes through an executor of `workers` threads, and each streamed
+    report holds one of `stream_workers` threads until it is sent; further reports wait
+    for one. The database's connection pool must allow one connection per thread of both
+    plus the threads that already hold one.
+    """
+
+    def __init__(self, database, workers=8, stream_workers=4, max_body=1 << 20):
+        self.database = database
+        self.max_body = max_body
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service")
+        self.stream_executor = ThreadPoolExecutor(max_workers=stream_workers,
+                                                  thread_name_prefix="service-stream")
+        self.server = None
+        self.routes = {
+            "/add_part": ("POST", self.add_part),
+            "/get_price": ("GET", self.get_price),
+            "/edit_part": ("PUT", self.edit_part),
+            "/delete_part": ("DELETE", self.delete_part),
+            "/generate_report": ("GET", self.generate_report),
+            "/metrics": ("GET", self.metrics),
+        }
+
+    async def start(self, host="0.0.0.0", port=8000):
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def serve(self, host="0.0.0.0", port=8000):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        self.executor.shutdown(wait=True)
+        self.stream_executor.shutdown(wait=True)
+
+    async def run(self, func, *args):
+        """Run a blocking database call on the executor."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def stream(self, chunks, window=8):
+        """
+        Iterate the blocking generator `chunks` on one `stream_executor` thread and yield
+        its items on the event loop, with at most `window` chunks in flight. The generator
+        stays on one thread, and so on that thread's database connection.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        credits = threading.Semaphore(window)
+        stop = threading.Event()
+        done = object()
+
+        def produce():
+            try:
+                for chunk in chunks:
+                    credits.acquire()
+                    if stop.is_set():
+                        return
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        producer = loop.run_in_executor(self.stream_executor, produce)
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is done:
+                    break
+                credits.release()
+                yield chunk
+        finally:
+            # Stops the producer if the client went away mid-stream, waking it if it is
+            # waiting for a credit
+            stop.set()
+            credits.release()
+        await producer
+
+    # Endpoints: each takes (query, body) and returns (status, payload); a payload that is
+    # not a dict is an async iterator of text chunks
+
+    async def add_part(self, query, body):
+        data = self.json_body(body, "part_type", "part_name", "price")
+        price = self.number(data["price"], "price")
+        part_id = await self.run(self.database.add_part, data["part_type"], data["part_name"],
+                                 price, data.get("specs"))
+        if part_id is None:
+            raise HTTPError(HTTPStatus.CONFLICT,
+                            f"Part '{data['part_name']}' could not be added to '{data['part_type']}'")
+        return HTTPStatus.CREATED, {"id": part_id, "message": f"Part '{data['part_name']}' added"}
+
+    async def get_price(self, query, body):
+        part_name = self.query_value(query, "part_name")
+        matches = await self.run(self.database.search_parts, part_name)
+        if not matches:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Part '{part_name}' not found")
+        return HTTPStatus.OK, {"part_name": part_name,
+                               "parts": [{"type": part_type, "name": name, "price": price}
+                                         for part_type, name, price in matches]}
+
+    async def edit_part(self, query, body):
+        data = self.json_body(body, "part_name", "new_price")
+        price = self.number(data["new_price"], "new_price")
+        if not await self.run(self.database.edit_part, data["part_name"], price):
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Part '{data['part_name']}' not found")
+        return HTTPStatus.OK, {"message": f"Part '{data['part_name']}' updated"}
+
+    async def delete_part(self, query, body):
+        part_name = self.query_value(query, "part_name")
+        if not await self.run(self.database.delete_part, part_name):
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Part '{part_name}' not found")
+        return HTTPStatus.OK, {"message": f"Part '{part_name}' deleted"}
+
+    async def generate_report(self, query, body):
+        return HTTPStatus.OK, self.stream(iter_inventory_report(self.database))
+
+    async def metrics(self, query, body):
+        if query.get("format") == ["json"]:
+            return HTTPStatus.OK, registry.snapshot()
+        return HTTPStatus.OK, self.text(registry.to_prometheus())
+
+    async def text(self, text):
+        yield text
+
+    # Request helpers
+
+    def json_body(self, body, *required):
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+        missing = [field for field in required if data.get(field) in (None, "")]
+        if missing:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Missing fields: {', '.join(missing)}")
+        return data
+
+    def number(self, value, field):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{field}' must be a number")
+
+    def query_value(self, query, name):
+        values = query.get(name)
+        if not values or not values[0]:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Missing query parameter '{name}'")
+        return values[0]
+
+    # HTTP plumbing
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self.read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body, keep_alive = request
+                await self.respond(writer, method, target, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HTTPError as e:
+            # The request could not be parsed; answer once and drop the connection
+            await self.write_response(writer, e.status, {"error": str(e)}, False)
+        except Exception as e:
+            print(f"Error serving connection: {e}")
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Bad Content-Length")
+        if length > self.max_body:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+        return method, target, headers, body, keep_alive
+
+    async def respond(self, writer, method, target, body, keep_alive):
+        url = urlsplit(target)
+        route = self.routes.get(url.path)
+        try:
+            if route is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"No endpoint {url.path}")
+            if method != route[0]:
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"Use {route[0]} for {url.path}")
+            status, payload = await route[1](parse_qs(url.query), body)
+        except HTTPError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:
+            print(f"Error handling {method} {url.path}: {e}")
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+        await self.write_response(writer, status, payload, keep_alive)
+
+    async def write_response(self, writer, status, payload, keep_alive):
+        status = HTTPStatus(status)
+        head = [f"HTTP/1.1 {status.value} {status.phrase}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if isinstance(payload, dict):
+            data = json.dumps(payload).encode("utf-8")
+            head += ["Content-Type: application/json", f"Content-Length: {len(data)}"]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+            await writer.drain()
+            return
+        # Stream text chunks as they are read from the database
+        head += ["Content-Type: text/plain; charset=utf-8", "Transfer-Encoding: chunked"]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        try:
+            async for chunk in payload:
+                data = chunk.encode("utf-8")
+                writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                await writer.drain()
+        finally:
+            await payload.aclose()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Car parts HTTP service")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--db", default="car_parts.db", help="SQLite database file")
+    parser.add_argument("--workers", type=int, default=8, help="threads for database calls")
+    parser.add_argument("--stream-workers", type=int, default=4,
+                        help="threads for streamed reports, one per report being sent")
+    args = parser.parse_args(argv)
+
+    # One pooled connection per worker and stream thread, plus the one opened here
+    database = CarPartDatabase(args.db, pool_size=args.workers + args.stream_workers + 1)
+    service = CarPartsService(database, workers=args.workers, stream_workers=args.stream_workers)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.run import BENCHMARKS, compare, main, missing_results, parse_scale
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.baseline = os.path.join(self.tmpdir, 'baseline.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def run_suite(self, *args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return main(["--scale", "50", "--repeat", "1", "--ops", "20",
+                         "--baseline", self.baseline] + list(args))
+
+    def test_every_benchmark_runs(self):
+        """A tiny run covers every benchmark and writes JSON results"""
+        output = os.path.join(self.tmpdir, 'results.json')
+        self.assertEqual(self.run_suite("--output", output, "--save-baseline"), 0)
+        with open(output) as file:
+            results = json.load(file)["results"]
+        self.assertEqual(set(results), {f"{name}@50" for name in BENCHMARKS})
+        self.assertTrue(all(result["items_per_s"] > 0 for result in results.values()))
+        self.assertTrue(os.path.exists(self.baseline))
+
+    def test_compare_flags_slowdowns(self):
+        """Only results slower than the tolerance allows are regressions"""
+        baseline = {"results": {"a@1k": {"items_per_s": 100}, "b@1k": {"items_per_s": 100}}}
+        results = {"a@1k": {"items_per_s": 80}, "b@1k": {"items_per_s": 70}, "c@1k": {"items_per_s": 1}}
+        self.assertEqual(compare(results, baseline, 0.25), [("b@1k", 100, 70)])
+        self.assertEqual(parse_scale("100k"), 100000)
+        self.assertEqual(parse_scale("1M"), 1000000)
+
+    def test_baseline_is_required_and_complete(self):
+        """No baseline file fails; so does a baselined benchmark the run did not produce"""
+        only = ("--only", "db.get_part")
+        self.assertEqual(self.run_suite(*only), 1)
+        self.assertEqual(self.run_suite("--no-compare", *only), 0)
+        self.assertEqual(self.run_suite("--save-baseline", *only), 0)
+        with open(self.baseline) as file:
+            baseline = json.load(file)
+        baseline["results"]["db.renamed@50"] = {"items_per_s": 1}
+        with open(self.baseline, "w") as file:
+            json.dump(baseline, file)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = main(["--scale", "50", "--repeat", "1", "--ops", "20", "--baseline", self.baseline,
+                           "--only", "db.renamed,db.get_part"])
+        self.assertEqual(status, 1)
+        self.assertIn("MISSING db.renamed@50", output.getvalue())
+        self.assertEqual(missing_results({}, baseline, {"50"}, ["db.renamed"]), ["db.renamed@50"])
+        self.assertEqual(missing_results({}, baseline, {"1k"}), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from core.CarPartDatabase import CarPartDatabase as PartStore
+from core.car_parts import (BatchCarBuilder, BuildSpec, CarBuilder, CarFactory, CarPartDatabase, Color,
+                            ConcreteCar, Engine, SedanFactory, TruckFactory, part_registry,
+                            set_part_store)
+from utils.singleton import SingletonMeta
+
+
+class CarModelTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Point the factories at a fresh, seeded parts database."""
+        SingletonMeta.reset_all()
+        part_registry.clear()
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = PartStore(os.path.join(self.tmpdir, 'parts.db'))
+        set_part_store(self.store)
+
+    def tearDown(self):
+        self.store.close()
+        set_part_store(None)
+        SingletonMeta.reset_all()
+        shutil.rmtree(self.tmpdir)
+
+
+class TestFlyweightParts(CarModelTestCase):
+
+    def test_parts_have_no_instance_dict(self):
+        """Engine and Color use slots instead of a per-instance __dict__"""
+        self.assertFalse(hasattr(Engine("V6"), "__dict__"))
+        self.assertFalse(hasattr(Color("red"), "__dict__"))
+        self.assertEqual(Color("red").get_price(), 0)
+
+    def test_registry_shares_identical_parts(self):
+        """The same spec always yields the same instance"""
+        self.assertIs(part_registry.get(Engine, "V8"), part_registry.get(Engine, "V8"))
+        self.assertIsNot(part_registry.get(Engine, "V8"), part_registry.get(Engine, "V6"))
+        self.assertEqual(len(part_registry), 2)
+
+    def test_factories_share_parts(self):
+        """Factories hand out shared parts resolved from the catalog once"""
+        factory = SedanFactory()
+        engine = factory.create_engine()
+        self.assertIs(factory.create_engine(), engine)
+        self.assertEqual((engine.power, engine.get_price()), ("V6", 300))
+        self.assertEqual(factory.create_color().code, "FF0000")
+        self.assertEqual(TruckFactory().create_engine().get_price(), 500)
+        self.assertEqual(self.store.cache_stats()["misses"], 3)
+
+    def test_factories_follow_catalog_changes(self):
+        """Editing a part changes what factories build; missing parts are not cached"""
+        self.assertEqual(SedanFactory().create_engine().get_price(), 300)
+        self.store.edit_part("V6", 999)
+        self.assertEqual(SedanFactory().create_engine().get_price(), 999)
+        self.store.delete_part("V8")
+        with self.assertRaises(ValueError):
+            TruckFactory().create_engine()
+
+    def test_price_edits_replace_shared_parts(self):
+        """Each catalog entry holds one shared part, however often its price changes"""
+        engine = SedanFactory().create_engine()
+        self.assertIs(SedanFactory().create_engine(), engine)
+        BatchCarBuilder(self.store).build_all([BuildSpec(SedanFactory, 3)])
+        size = len(part_registry)
+        for price in range(301, 321):
+            self.store.edit_part("V6", price)
+            self.assertEqual(SedanFactory().create_engine().get_price(), price)
+            [car] = BatchCarBuilder(self.store).build_all([BuildSpec(SedanFactory, 1)])
+            self.assertEqual(car.engine.get_price(), price)
+        self.assertEqual(len(part_registry), size)
+
+    def test_parts_are_smaller(self):
+        """A slotted part is smaller than the same object with a __dict__"""
+        class DictEngine:
+            def __init__(self):
+                self.power = "V6"
+                self.price = 1000
+
+        plain = DictEngine()
+        self.assertLess(sys.getsizeof(Engine("V6")),
+                        sys.getsizeof(plain) + sys.getsizeof(plain.__dict__))
+
+
+class TestCarClone(CarModelTestCase):
+
+    def make_car(self):
+        car = ConcreteCar()
+        car.engine = SedanFactory().create_engine()
+        car.color = SedanFactory().create_color()
+        car.options = ["sunroof"]
+        return car
+
+    def test_clone_shares_parts(self):
+        """Clones reuse the original's part objects"""
+        car = self.make_car()
+        clone = car.clone()
+        self.assertIsInstance(clone, ConcreteCar)
+        self.assertIsNot(clone, car)
+        self.assertIs(clone.engine, car.engine)
+        self.assertIs(clone.color, car.color)
+
+    def test_clone_copies_car_state(self):
+        """Changing a clone leaves the original untouched"""
+        car = self.make_car()
+        clone = car.clone()
+        clone.options.append("towbar")
+        clone.color = TruckFactory().create_color()
+        self.assertEqual(car.options, ["sunroof"])
+        self.assertEqual(car.color.code, "FF0000")
+
+    def test_clone_many(self):
+        """clone_many returns independent copies"""
+        clones = self.make_car().clone_many(50)
+        self.assertEqual(len(clones), 50)
+        self.assertEqual(len({id(clone) for clone in clones}), 50)
+        self.assertEqual(len({id(clone.engine) for clone in clones}), 1)
+
+
+class TestBatchCarBuilder(CarModelTestCase):
+
+    def test_car_builder_builds_a_car(self):
+        """The step-by-step builder produces a complete car"""
+        builder = CarBuilder(SedanFactory())
+        builder.set_engine()
+        builder.set_color()
+        self.assertEqual(builder.build().get_details(), "Car with Engine and Color")
+
+    def test_build_is_lazy(self):
+        """Cars are generated one at a time"""
+        cars = BatchCarBuilder().build([BuildSpec(SedanFactory, count=10 ** 9)])
+        self.assertIsInstance(next(cars), ConcreteCar)
+
+    def test_parts_resolved_once_per_batch(self):
+        """Each catalog entry is looked up once, whatever the car count"""
+        catalog = CarPartDatabase()
+        calls = []
+        catalog_get = catalog.get_part
+        catalog.get_part = lambda *key: calls.append(key) or catalog_get(*key)
+        cars = BatchCarBuilder(catalog).build_all([
+            BuildSpec(SedanFactory, count=500),
+            BuildSpec(TruckFactory(), count=500, overrides={"color": "red"}),
+        ])
+        self.assertEqual(len(cars), 1000)
+        self.assertEqual(sorted(calls), [("colors", "red"), ("engines", "V6"), ("engines", "V8")])
+        self.assertIs(cars[0].color, cars[-1].color)
+        self.assertEqual(cars[-1].engine.get_price(), 500)
+
+    def test_overrides(self):
+        """Part instances and plain options can be overridden per spec"""
+        custom = Engine("electric", price=5000)
+        car, = BatchCarBuilder().build([BuildSpec(SedanFactory, overrides={
+            "engine": custom, "options": ["sunroof"]})])
+        self.assertIs(car.engine, custom)
+        self.assertEqual(car.options, ["sunroof"])
+
+    def test_unknown_override_is_rejected(self):
+        """An override naming a part the catalog lacks fails instead of building bad cars"""
+        with self.assertRaises(ValueError):
+            BatchCarBuilder().build_all([BuildSpec(SedanFactory, count=5, overrides={"engine": "NOPE"})])
+
+    def test_factory_without_part_names(self):
+        """Custom factories fall back to their create methods"""
+        class CustomFactory(CarFactory):
+            def create_engine(self):
+                return Engine("W16")
+
+            def create_color(self):
+                return Color("black")
+
+        cars = BatchCarBuilder().build_all([BuildSpec(CustomFactory, count=3)])
+        self.assertEqual({car.engine.power for car in cars}, {"W16"})
+
+
+class TestCatalogSnapshots(unittest.TestCase):
+
+    def setUp(self):
+        """Start every test from the default in-memory catalog."""
+        CarPartDatabase.reset()
+        self.catalog = CarPartDatabase()
+
+    def test_snapshot_shares_until_written(self):
+        """A snapshot copies only the categories it modifies"""
+        snapshot = self.catalog.copy()
+        self.assertIs(snapshot.parts["engines"], self.catalog.parts["engines"])
+        snapshot.set_part("engines", "V8", 550)
+        self.assertIsNot(snapshot.parts["engines"], self.catalog.parts["engines"])
+        self.assertIs(snapshot.parts["tires"], self.catalog.parts["tires"])
+        self.assertEqual(self.catalog.get_part("engines", "V8"), 500)
+        self.assertEqual(snapshot.get_part("engines", "V8"), 550)
+
+    def test_live_writes_do_not_leak_into_snapshot(self):
+        """Changing the live catalog leaves existing snapshots as they were"""
+        snapshot = self.catalog.copy()
+        self.catalog.remove_part("tires", "Pirelli")
+        self.assertEqual(snapshot.get_part("tires", "Pirelli"), 100)
+        self.assertEqual(snapshot.diff(), {})
+
+    def test_diff_and_merge(self):
+        """A snapshot's changes can be listed and merged back"""
+        snapshot = self.catalog.copy()
+        snapshot.set_part("engines", "V8", 550).set_part("engines", "V10", 900)
+        snapshot.remove_part("seats", "cloth")
+        self.catalog.set_part("tires", "Michelin", 160)
+        self.assertEqual(snapshot.diff(), {
+            ("engines", "V8"): (500, 550),
+            ("engines", "V10"): (None, 900),
+            ("seats", "cloth"): (100, None),
+        })
+        self.catalog.merge(snapshot)
+        self.assertEqual(self.catalog.parts["engines"], {"V8": 550, "V6": 300, "V10": 900})
+        self.assertNotIn("cloth", self.catalog.parts["seats"])
+        self.assertEqual(self.catalog.get_part("tires", "Michelin"), 160)
+        self.assertEqual(snapshot.get_part("seats", "leather"), 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
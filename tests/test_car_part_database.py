@@ -0,0 +1,227 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from core.CarPartDatabase import CarPartDatabase
+from core.connection_pool import ConnectionPool
+from core.migrations import current_version
+from utils.singleton import SingletonMeta
+
+
+class DatabaseTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Open a fresh database file for every test."""
+        SingletonMeta.reset_all()
+        self.tmpdir = tempfile.mkdtemp()
+        self.database = CarPartDatabase(os.path.join(self.tmpdir, 'parts.db'), seed=False)
+
+    def tearDown(self):
+        self.database.close()
+        SingletonMeta.reset_all()
+        shutil.rmtree(self.tmpdir)
+
+    def count(self, table):
+        return self.database.conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+
+class TestCarPartDatabaseBulk(DatabaseTestCase):
+
+    def test_add_parts_returns_ids(self):
+        """Bulk insert assigns consecutive ids after existing rows"""
+        first = self.database.add_part("engines", "V12", 900)
+        ids = self.database.add_parts([
+            ("tires", "Bridgestone", 120),
+            {"type": "seats", "name": "sport", "price": 250, "specs": {"color": "black"}},
+        ])
+        self.assertEqual(ids, [first + 1, first + 2])
+        self.assertEqual(self.count('inventory'), 3)
+
+    def test_add_parts_streams_in_chunks(self):
+        """A generator larger than the chunk size is inserted completely"""
+        rows = (("tires", f"T{i}", i + 1) for i in range(2500))
+        ids = self.database.add_parts(rows, chunk_size=1000)
+        self.assertEqual(len(ids), 2500)
+        self.assertEqual(self.count('parts'), 2500)
+        self.assertEqual(self.count('inventory'), 2500)
+
+    def test_add_parts_rolls_back_on_error(self):
+        """A bad row leaves no partial batch behind"""
+        ids = self.database.add_parts([("tires", "ok", 10), ("tires", None, 10)])
+        self.assertIsNone(ids)
+        self.assertEqual(self.count('parts'), 0)
+        self.assertEqual(self.count('inventory'), 0)
+
+
+class TestCarPartDatabaseIndexes(DatabaseTestCase):
+
+    def test_indexes_created(self):
+        """create_tables applies the parts migrations, including every index, once"""
+        names = {row[0] for row in self.database.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertTrue({'idx_parts_type_name', 'idx_parts_name', 'idx_inventory_part_id'} <= names)
+        self.assertTrue({"idx_parts_type", "idx_parts_price"} <= names)
+        self.assertEqual(current_version(self.database.conn, "parts"), 3)
+        self.assertEqual(self.database.create_tables(), [])
+
+    def test_type_name_is_unique(self):
+        """The same part cannot be added twice to one category"""
+        self.assertIsNotNone(self.database.add_part("engines", "V8", 500))
+        self.assertIsNone(self.database.add_part("engines", "V8", 600))
+        self.assertIsNotNone(self.database.add_part("colors", "V8", 0))
+
+    def test_find_by_name_uses_index(self):
+        """The query find_by_name runs is served by idx_parts_name instead of a scan"""
+        conn = self.database.conn
+        statements = []
+        conn.set_trace_callback(statements.append)
+        try:
+            self.database.find_by_name("V8")
+        finally:
+            conn.set_trace_callback(None)
+        query, = [sql for sql in statements if sql.lstrip().startswith('SELECT')]
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()
+        self.assertIn('idx_parts_name', ' '.join(str(row) for row in plan))
+
+    def test_find_and_list(self):
+        """find_by_name and list_by_type return matching rows"""
+        self.database.add_parts([("tires", "Pirelli", 100), ("tires", "Michelin", 150),
+                                 ("wheels", "Pirelli", 80)])
+        self.assertEqual({row[1] for row in self.database.find_by_name("Pirelli")}, {"tires", "wheels"})
+        self.assertEqual([row[2] for row in self.database.list_by_type("tires")], ["Michelin", "Pirelli"])
+
+    def test_delete_part_removes_inventory(self):
+        """Deleting a part also drops its inventory row"""
+        self.database.add_part("tires", "Pirelli", 100)
+        self.assertTrue(self.database.delete_part("Pirelli"))
+        self.assertEqual(self.count('inventory'), 0)
+        self.assertFalse(self.database.delete_part("Pirelli"))
+
+
+class TestCarPartDatabaseCache(DatabaseTestCase):
+
+    def test_default_catalog_is_seeded(self):
+        """A new database starts with the built-in catalog"""
+        self.database.seed_default_parts()
+        self.assertEqual(self.database.get_part("engines", "V8"), 500)
+        self.assertEqual(self.database.get_part("colors", "red"), "FF0000")
+        self.assertEqual(self.database.parts["tires"], {"Michelin": 150, "Pirelli": 100})
+
+    def test_get_part_reads_through_cache(self):
+        """The second lookup is served from the cache"""
+        self.database.add_part("engines", "V8", 500)
+        self.assertEqual(self.database.get_part("engines", "V8"), 500)
+        self.assertEqual(self.database.get_part("engines", "V8"), 500)
+        stats = self.database.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertIsNone(self.database.get_part("engines", "V10"))
+
+    def test_writes_invalidate(self):
+        """update_part and delete_part drop the cached entry"""
+        part_id = self.database.add_part("engines", "V8", 500)
+        self.database.get_part("engines", "V8")
+        self.database.update_part(part_id, price=650)
+        self.assertEqual(self.database.get_part("engines", "V8"), 650)
+        self.database.delete_part("V8")
+        self.assertIsNone(self.database.get_part("engines", "V8"))
+
+    def test_cache_is_bounded(self):
+        """Old entries are evicted once the cache is full"""
+        self.database.part_cache.maxsize = 2
+        self.database.add_parts([("tires", f"T{i}", i + 1) for i in range(3)])
+        for i in range(3):
+            self.database.get_part("tires", f"T{i}")
+        self.assertEqual(self.database.cache_stats()["evictions"], 1)
+        self.assertEqual(len(self.database.part_cache), 2)
+
+
+class TestPartNameIndex(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.database.add_parts([("tires", "Pirelli", 100), ("wheels", "Pirelli", 80),
+                                 ("tires", "Michelin", 150), ("seats", "leather", 300)])
+
+    def test_search_covers_all_categories(self):
+        """A name-only search finds the part in every category, ignoring case"""
+        self.assertEqual(sorted(self.database.search_parts("pirelli")),
+                         [("tires", "Pirelli", 100), ("wheels", "Pirelli", 80)])
+        self.assertEqual(self.database.search_parts("pirelli", case_sensitive=True), [])
+
+    def test_prefix_search(self):
+        """Prefix matches come back in name order"""
+        self.database.add_part("brakes", "Pirate", 20)
+        self.assertEqual([name for _, name, _ in self.database.search_prefix("PIR", limit=2)],
+                         ["Pirate", "Pirelli"])
+        self.assertEqual(self.database.search_prefix("zz"), [])
+
+    def test_index_follows_writes(self):
+        """Adds, price updates and deletes are reflected without a rebuild"""
+        self.database.search_parts("leather")
+        self.database.add_part("engines", "V8", 500)
+        part_id = self.database.find_by_name("leather")[0][0]
+        self.database.update_part(part_id, price=350)
+        self.database.delete_part("Michelin")
+        self.assertEqual(self.database.search_parts("v8"), [("engines", "V8", 500)])
+        self.assertEqual(self.database.search_parts("leather"), [("seats", "leather", 350)])
+        self.assertEqual(self.database.search_parts("Michelin"), [])
+
+
+class TestConnectionPool(DatabaseTestCase):
+
+    def run_in_thread(self, func):
+        outcome = {}
+
+        def target():
+            try:
+                outcome['result'] = func()
+            except Exception as e:
+                outcome['error'] = e
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['result']
+
+    def test_wal_mode(self):
+        """Connections are opened in WAL mode with the configured pragmas"""
+        self.assertEqual(self.database.conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        self.assertEqual(self.database.conn.execute('PRAGMA cache_size').fetchone()[0], -64000)
+
+    def test_one_connection_per_thread(self):
+        """Each thread gets its own connection, reused on later calls"""
+        main_conn = self.database.conn
+        self.assertIs(self.database.conn, main_conn)
+        other_conn = self.run_in_thread(lambda: self.database.conn)
+        self.assertIsNot(other_conn, main_conn)
+        self.assertEqual(len(self.database.pool), 2)
+
+    def test_readers_not_blocked_by_writer(self):
+        """A reader thread sees committed data while a write transaction is open"""
+        self.database.add_part("tires", "Pirelli", 100)
+        self.database.conn.execute('BEGIN IMMEDIATE')
+        self.database.conn.execute("INSERT INTO parts (type, name, price) VALUES ('tires', 'x', 1)")
+        rows = self.run_in_thread(lambda: self.database.find_by_name("Pirelli"))
+        self.database.conn.rollback()
+        self.assertEqual(len(rows), 1)
+
+    def test_pool_size_is_enforced(self):
+        """Threads beyond the pool size time out, dead threads free their slot"""
+        pool = ConnectionPool(os.path.join(self.tmpdir, 'small.db'), size=1, timeout=0.1)
+        self.run_in_thread(pool.connection)
+        pool.connection()
+        with self.assertRaises(sqlite3.OperationalError):
+            self.run_in_thread(pool.connection)
+        pool.release()
+        self.run_in_thread(pool.connection)
+        pool.close_all()
+        self.assertEqual(len(pool), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
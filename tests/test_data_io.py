@@ -0,0 +1,122 @@
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from core.CarPartDatabase import CarPartDatabase
+from core.data_io import EXPORT_COLUMNS, export_parts, import_parts_csv, validate_part_row
+from utils.singleton import SingletonMeta
+
+
+class DataIOTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Open an empty database in a throwaway directory."""
+        SingletonMeta.reset_all()
+        self.tmpdir = tempfile.mkdtemp()
+        self.database = CarPartDatabase(os.path.join(self.tmpdir, 'parts.db'), seed=False)
+
+    def tearDown(self):
+        self.database.close()
+        SingletonMeta.reset_all()
+        shutil.rmtree(self.tmpdir)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w', newline='') as f:
+            f.write(content)
+        return path
+
+
+class TestCsvImport(DataIOTestCase):
+
+    def test_validate_part_row(self):
+        """Rows are checked for type, name, positive price and JSON specs"""
+        self.assertEqual(validate_part_row({"type": "tires", "name": "X", "price": "10",
+                                            "specs": '{"size": 17}'}),
+                         ("tires", "X", 10.0, {"size": 17}))
+        for row in ({"type": "", "name": "X", "price": "1"},
+                    {"type": "tires", "name": "X", "price": "abc"},
+                    {"type": "tires", "name": "X", "price": "-5"},
+                    {"type": "tires", "name": "X", "price": "5", "specs": "{bad"}):
+            with self.assertRaises(ValueError):
+                validate_part_row(row)
+
+    def test_import_reports_row_errors(self):
+        """Valid rows are stored, invalid ones are reported with their line"""
+        path = self.write_file('parts.csv', 'type,name,price,specs\n'
+                                            'tires,Pirelli,100,\n'
+                                            'tires,,100,\n'
+                                            'engines,V8,500,"{""cylinders"": 8}"\n'
+                                            'seats,cloth,free,\n')
+        result = import_parts_csv(self.database, path)
+        self.assertEqual((result.rows_read, result.rows_imported, result.error_count), (4, 2, 2))
+        self.assertEqual([line for line, _ in result.errors], [3, 5])
+        self.assertEqual(self.database.get_part("engines", "V8"), 500)
+
+    def test_import_in_chunks_with_progress(self):
+        """Large files are written chunk by chunk and progress is reported"""
+        rows = ''.join(f'tires,T{i},{i + 1}\n' for i in range(250))
+        path = self.write_file('parts.csv', 'type,name,price\n' + rows)
+        calls = []
+        result = import_parts_csv(self.database, path, chunk_size=100,
+                                  progress=lambda r: calls.append(r.rows_imported))
+        self.assertEqual(result.rows_imported, 250)
+        self.assertEqual(calls, [100, 200, 250])
+
+    def test_duplicates_fall_back_to_single_rows(self):
+        """A rejected chunk is retried row by row so only duplicates fail"""
+        self.database.add_part("tires", "Pirelli", 100)
+        path = self.write_file('parts.csv', 'type,name,price\ntires,Michelin,150\ntires,Pirelli,90\n')
+        result = import_parts_csv(self.database, path)
+        self.assertEqual(result.rows_imported, 1)
+        self.assertEqual(result.errors[0][0], 3)
+
+    def test_missing_columns(self):
+        """A file without the required header is refused"""
+        path = self.write_file('parts.csv', 'name,price\nX,1\n')
+        with self.assertRaises(ValueError):
+            import_parts_csv(self.database, path)
+
+
+class TestExport(DataIOTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.database.add_parts([("tires", f"T{i}", i + 1, {"size": i}) for i in range(25)])
+
+    def test_csv_export_round_trips(self):
+        """An exported CSV can be imported back into an empty database"""
+        path = os.path.join(self.tmpdir, 'parts.csv')
+        self.assertEqual(export_parts(self.database, path, batch_size=10), 25)
+        with open(path, newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(tuple(rows[0]), EXPORT_COLUMNS)
+        self.assertEqual(rows[1][1:6], ["tires", "T0", "1.0", '{"size": 0}', "0"])
+
+        self.database.conn.execute('DELETE FROM parts')
+        self.database.conn.commit()
+        self.assertEqual(import_parts_csv(self.database, path).rows_imported, 25)
+
+    def test_gzip_jsonl_export(self):
+        """JSON Lines output is chosen and compressed from the file name"""
+        path = os.path.join(self.tmpdir, 'parts.jsonl.gz')
+        export_parts(self.database, path)
+        with gzip.open(path, 'rt') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 25)
+        self.assertEqual(records[3]["specs"], {"size": 3})
+        self.assertEqual(records[3]["quantity"], 0)
+
+    def test_iter_parts_is_lazy(self):
+        """iter_parts hands out rows without materializing the table"""
+        rows = self.database.iter_parts(batch_size=5)
+        self.assertEqual(next(rows)[2], "T0")
+        self.assertEqual(sum(1 for _ in rows), 24)
+
+
+if __name__ == '__main__':
+    unittest.main()
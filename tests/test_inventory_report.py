@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from core.CarPartDatabase import CarPartDatabase
+from core.inventory_report import (REPORT_HEADER, iter_category_report, iter_inventory_report,
+                                   write_report)
+from utils.singleton import SingletonMeta
+
+
+class TestInventoryReport(unittest.TestCase):
+
+    def setUp(self):
+        """Open a fresh database seeded with the default catalog."""
+        SingletonMeta.reset_all()
+        self.tmpdir = tempfile.mkdtemp()
+        self.database = CarPartDatabase(os.path.join(self.tmpdir, 'parts.db'))
+
+    def tearDown(self):
+        self.database.close()
+        SingletonMeta.reset_all()
+        shutil.rmtree(self.tmpdir)
+
+    def test_report_sections(self):
+        """The report lists every category with its parts"""
+        report = "".join(iter_inventory_report(self.database))
+        self.assertTrue(report.startswith(REPORT_HEADER))
+        self.assertIn("\nENGINES:\n" + "-" * 30 + "\nV6: $300.0\nV8: $500.0\n", report)
+        self.assertIn("red: Color Code #FF0000\n", report)
+        self.assertIn("Report generated on: ", report)
+
+    def test_chunks_are_bounded(self):
+        """Large categories are split into chunks of at most chunk_lines lines"""
+        self.database.add_parts(("tires", f"tire{n:04d}", n) for n in range(1000))
+        chunks = list(iter_category_report(self.database, "tires", chunk_lines=100))
+        self.assertEqual(len(chunks), 11)
+        self.assertTrue(all(chunk.count("$") <= 100 for chunk in chunks))
+        self.assertEqual("".join(chunks).count("$"), 1002)
+
+    def test_write_report(self):
+        """Exports stream the same text to disk"""
+        path = os.path.join(self.tmpdir, 'report.txt')
+        written = write_report(self.database, path, chunk_lines=3)
+        with open(path, encoding='utf-8') as file:
+            text = file.read()
+        self.assertEqual(len(text), written)
+        self.assertEqual(text.split("Report generated on")[0],
+                         "".join(iter_inventory_report(self.database)).split("Report generated on")[0])
+
+    def test_category_versions(self):
+        """Only the categories a write touches get a new version"""
+        before = self.database.category_versions()
+        self.assertEqual(set(before), {"colors", "engines", "seats", "tires", "wheels"})
+        self.database.add_part("engines", "V12", 900)
+        part_id = self.database.find_by_name("Pirelli")[0][0]
+        self.database.update_part(part_id, price=110)
+        after = self.database.category_versions()
+        changed = {category for category in after if after[category] != before[category]}
+        self.assertEqual(changed, {"engines", "tires"})
+        self.database.delete_part("cloth")
+        self.assertNotEqual(self.database.category_versions()["seats"], after["seats"])
+
+
+if __name__ == '__main__':
+    unittest.main()
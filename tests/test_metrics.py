@@ -0,0 +1,129 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from core.CarPartDatabase import CarPartDatabase
+from core.car_parts import SedanFactory, part_registry, set_part_store
+from utils.metrics import MetricsRegistry, registry
+from utils.singleton import SingletonMeta
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_instrument_counts_calls_failures_and_errors(self):
+        """Calls, failure results and exceptions are counted and latency recorded"""
+        @self.registry.instrument("op", failure_values=(None,))
+        def lookup(value):
+            if value < 0:
+                raise ValueError("negative")
+            return value or None
+
+        self.assertEqual(lookup(3), 3)
+        self.assertIsNone(lookup(0))
+        with self.assertRaises(ValueError):
+            lookup(-1)
+        stats = self.registry.snapshot()["op"]
+        self.assertEqual((stats["calls"], stats["failures"], stats["errors"], stats["in_flight"]),
+                         (3, 1, 1, 0))
+        self.assertEqual(sum(stats["buckets"].values()), 3)
+        self.assertGreater(stats["seconds"], 0)
+        self.assertEqual(lookup.__name__, "lookup")
+
+    def test_in_flight_and_threads(self):
+        """In-flight calls show in the gauge, survive a reset, and counts from every thread are summed"""
+        entered, release = threading.Event(), threading.Event()
+
+        @self.registry.instrument("wait")
+        def wait():
+            entered.set()
+            release.wait(5)
+
+        thread = threading.Thread(target=wait)
+        thread.start()
+        entered.wait(5)
+        self.assertEqual(self.registry.snapshot()["wait"]["in_flight"], 1)
+        self.registry.reset()
+        self.assertEqual(self.registry.snapshot()["wait"]["in_flight"], 1)
+        release.set()
+        thread.join(5)
+
+        fast = self.registry.instrument("fast")(lambda: None)
+        threads = [threading.Thread(target=lambda: [fast() for _ in range(500)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        snapshot = self.registry.snapshot()
+        self.assertEqual((snapshot["wait"]["in_flight"], snapshot["wait"]["calls"]), (0, 1))
+        self.assertEqual(snapshot["fast"]["calls"], 2000)
+
+    def test_disabled(self):
+        """A disabled registry records nothing; one created disabled does not wrap at all"""
+        func = self.registry.instrument("op")(lambda: 1)
+        self.registry.disable()
+        self.assertEqual(func(), 1)
+        self.assertEqual(self.registry.snapshot()["op"]["calls"], 0)
+
+        def plain():
+            pass
+        self.assertIs(MetricsRegistry(enabled=False).instrument("op")(plain), plain)
+
+    def test_export_formats(self):
+        """Prometheus text has cumulative buckets; JSON round-trips the snapshot"""
+        func = self.registry.instrument("db.get_part")(lambda: None)
+        func()
+        func()
+        text = self.registry.to_prometheus()
+        self.assertIn("# TYPE carparts_calls_total counter", text)
+        self.assertIn('carparts_calls_total{op="db.get_part"} 2', text)
+        self.assertIn('carparts_in_flight{op="db.get_part"} 0', text)
+        self.assertIn('carparts_call_seconds_bucket{op="db.get_part",le="+Inf"} 2', text)
+        self.assertIn('carparts_call_seconds_count{op="db.get_part"} 2', text)
+        self.assertEqual(json.loads(self.registry.to_json()), self.registry.snapshot())
+        self.registry.reset()
+        self.assertEqual(self.registry.snapshot()["db.get_part"]["calls"], 0)
+
+
+class TestInstrumentedModules(unittest.TestCase):
+
+    def setUp(self):
+        SingletonMeta.reset_all()
+        self.tmpdir = tempfile.mkdtemp()
+        self.database = CarPartDatabase(os.path.join(self.tmpdir, 'parts.db'))
+        set_part_store(self.database)
+        registry.reset()
+
+    def tearDown(self):
+        registry.reset()
+        set_part_store(None)
+        part_registry.clear()
+        self.database.close()
+        SingletonMeta.reset_all()
+        shutil.rmtree(self.tmpdir)
+
+    def test_database_and_factory_hooks(self):
+        """Database methods and factories record under their operation names"""
+        self.database.add_part("engines", "V12", 900)
+        self.database.get_part("engines", "V12")
+        self.database.get_part("engines", "missing")
+        self.database.delete_part("missing")
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot["db.add_part"]["calls"], 1)
+        self.assertEqual((snapshot["db.get_part"]["calls"], snapshot["db.get_part"]["failures"]), (2, 1))
+        self.assertEqual(snapshot["db.delete_part"]["failures"], 1)
+        rows = list(self.database.iter_parts(batch_size=2))
+        fetches = registry.snapshot()["db.iter_parts"]
+        # One fetch per batch of up to two rows, then the empty one that ends the loop
+        self.assertEqual((fetches["calls"], fetches["items"]), ((len(rows) + 1) // 2 + 1, len(rows)))
+        SedanFactory().create_engine()
+        self.assertEqual(registry.snapshot()["factory.sedan.create_engine"]["calls"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
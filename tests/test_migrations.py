@@ -0,0 +1,128 @@
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from core.migrations import (Backfill, Migration, current_version, main, migrate, migration_log,
+                             pending_migrations)
+
+
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'test.db')
+        self.conn = sqlite3.connect(self.path)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_components_migrate_once_and_are_logged(self):
+        """Each component applies its migrations in order, records them and is then current"""
+        applied = migrate(self.conn, "parts")
+        self.assertEqual([version for version, _, _ in applied], [1, 2, 3])
+        migrate(self.conn, "reports")
+        migrate(self.conn, "legacy")
+        self.assertEqual(migrate(self.conn, "parts"), [])
+        self.assertEqual((current_version(self.conn, "parts"), current_version(self.conn, "reports"),
+                          current_version(self.conn, "legacy")), (3, 2, 1))
+        log = migration_log(self.conn)
+        self.assertEqual(len(log), 6)
+        self.assertTrue(all(duration_ms >= 0 for *_, duration_ms in log))
+        tables = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertTrue({"parts", "inventory", "reports", "car_parts", "engines", "schema_version"} <= tables)
+
+    def test_existing_schema_is_adopted(self):
+        """A file built before migrations gets recorded without losing its rows"""
+        self.conn.execute('CREATE TABLE parts (id INTEGER PRIMARY KEY, type TEXT NOT NULL, '
+                          'name TEXT NOT NULL, price REAL NOT NULL, specs TEXT, created_at TIMESTAMP)')
+        self.conn.execute("INSERT INTO parts (type, name, price) VALUES ('engines', 'V8', 500)")
+        self.conn.commit()
+        self.assertEqual(len(migrate(self.conn, "parts")), 3)
+        self.assertEqual(self.conn.execute('SELECT COUNT(*) FROM parts').fetchone()[0], 1)
+
+    def test_duplicate_parts_are_merged_on_upgrade(self):
+        """A file holding duplicate (type, name) rows upgrades fully, keeping one row each"""
+        self.conn.execute('CREATE TABLE parts (id INTEGER PRIMARY KEY, type TEXT NOT NULL, '
+                          'name TEXT NOT NULL, price REAL NOT NULL, specs TEXT, created_at TIMESTAMP)')
+        self.conn.execute('CREATE TABLE inventory (id INTEGER PRIMARY KEY, part_id INTEGER, '
+                          'quantity INTEGER DEFAULT 0, min_quantity INTEGER DEFAULT 5)')
+        self.conn.executemany('INSERT INTO parts (id, type, name, price) VALUES (?, ?, ?, ?)',
+                              [(1, 'engines', 'V8', 500), (2, 'engines', 'V8', 600),
+                               (3, 'engines', 'V6', 300), (4, 'engines', 'V8', 700)])
+        self.conn.executemany('INSERT INTO inventory (part_id, quantity) VALUES (?, ?)',
+                              [(1, 2), (2, 3), (3, 1), (4, 4)])
+        self.conn.commit()
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            migrate(self.conn, "parts")
+        self.assertIn("Removed 2 duplicate parts", output.getvalue())
+        self.assertEqual(current_version(self.conn, "parts"), 3)
+        self.assertEqual(self.conn.execute('SELECT id, price FROM parts ORDER BY id').fetchall(),
+                         [(1, 500), (3, 300)])
+        self.assertEqual(self.conn.execute('SELECT part_id, quantity FROM inventory ORDER BY part_id').fetchall(),
+                         [(1, 9), (3, 1)])
+        names = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertTrue({"idx_parts_type_name", "idx_parts_type", "idx_parts_price"} <= names)
+
+    def test_duplicate_stock_is_never_lost_or_counted_twice(self):
+        """Stock moves to a kept part without inventory; a kept part with several rows gets it once"""
+        self.conn.execute('CREATE TABLE parts (id INTEGER PRIMARY KEY, type TEXT NOT NULL, '
+                          'name TEXT NOT NULL, price REAL NOT NULL, specs TEXT, created_at TIMESTAMP)')
+        self.conn.execute('CREATE TABLE inventory (id INTEGER PRIMARY KEY, part_id INTEGER, '
+                          'quantity INTEGER DEFAULT 0, min_quantity INTEGER DEFAULT 5)')
+        self.conn.executemany('INSERT INTO parts (id, type, name, price) VALUES (?, ?, ?, ?)',
+                              [(1, 'tires', 'A', 10), (2, 'tires', 'A', 11),
+                               (3, 'tires', 'B', 20), (4, 'tires', 'B', 21)])
+        self.conn.executemany('INSERT INTO inventory (id, part_id, quantity) VALUES (?, ?, ?)',
+                              [(1, 2, 5), (2, 3, 1), (3, 3, 2), (4, 4, 4)])
+        self.conn.commit()
+        with contextlib.redirect_stdout(io.StringIO()):
+            migrate(self.conn, "parts")
+        self.assertEqual(self.conn.execute('SELECT id, part_id, quantity FROM inventory ORDER BY id').fetchall(),
+                         [(1, 1, 5), (2, 3, 5), (3, 3, 2)])
+        self.assertEqual(self.conn.execute('SELECT id, name, price, merged_into FROM removed_parts '
+                                           'ORDER BY id').fetchall(),
+                         [(2, 'A', 11, 1), (4, 'B', 21, 3)])
+
+    def test_backfill_runs_in_chunks_and_resumes(self):
+        """A backfill commits per chunk and skips rows a previous run finished"""
+        migrations = [
+            Migration(1, "create items", 'CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, n INTEGER)',
+                      lambda conn: conn.executemany('INSERT INTO items (n) VALUES (?)',
+                                                    ((n,) for n in range(1050)))),
+            Migration(2, "add doubled", 'ALTER TABLE items ADD COLUMN doubled INTEGER'),
+        ]
+        migrate(self.conn, "items", migrations)
+        self.conn.execute('UPDATE items SET doubled = n * 2 WHERE id <= 500')
+        self.conn.commit()
+        backfill = Backfill("items", "doubled = n * 2", where="doubled IS NULL", chunk_size=100)
+        self.assertEqual(backfill(self.conn), 550)
+        migrations.append(Migration(3, "fill doubled", backfill))
+        migrate(self.conn, "items", migrations)
+        self.assertEqual(self.conn.execute(
+            'SELECT COUNT(*) FROM items WHERE doubled IS NULL OR doubled != n * 2').fetchone()[0], 0)
+        self.assertEqual(current_version(self.conn, "items"), 3)
+
+    def test_versions_must_increase(self):
+        """Out of order or duplicate versions are rejected"""
+        with self.assertRaises(ValueError):
+            pending_migrations(self.conn, "items", [Migration(2, "b"), Migration(1, "a")])
+
+    def test_command_line(self):
+        """--status lists pending migrations; a plain run applies them and prints the log"""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main([self.path, "--component", "reports", "--status"])
+        self.assertIn("pending  reports 2: index report filters", output.getvalue())
+        with contextlib.redirect_stdout(output):
+            main([self.path, "--component", "reports"])
+        self.assertIn("applied  reports 2", output.getvalue())
+        self.assertEqual(current_version(self.conn, "reports"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from core.CarPartDatabase import ReportManager
+from core.car_parts import BuildSpec, Engine, SedanFactory, TruckFactory, part_registry
+from core.parallel import PricingSummary, price_orders
+from utils.singleton import SingletonMeta
+
+CATALOG = {"engines": {"V8": 500, "V6": 300}, "colors": {"red": "FF0000", "blue": "0000FF"}}
+
+
+class TestParallelPricing(unittest.TestCase):
+
+    def setUp(self):
+        SingletonMeta.reset_all()
+        part_registry.clear()
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        SingletonMeta.reset_all()
+        part_registry.clear()
+        shutil.rmtree(self.tmpdir)
+
+    def test_inline_run(self):
+        """workers=0 prices every car in the calling process"""
+        summary = price_orders([BuildSpec(SedanFactory, 250), BuildSpec(TruckFactory, 100)],
+                               workers=0, shard_size=100, catalog=CATALOG)
+        self.assertEqual(summary.cars, 350)
+        # V6 sedans at 300, V8 trucks at 500; colors are free
+        self.assertEqual(summary.total, 250 * 300 + 100 * 500)
+        self.assertEqual((summary.min_price, summary.max_price), (300, 500))
+
+    def test_prices_follow_the_catalog(self):
+        """Engine overrides and catalog price changes change the totals"""
+        specs = [BuildSpec(SedanFactory, 10, {"engine": "V8"})]
+        self.assertEqual(price_orders(specs, workers=0, catalog=CATALOG).total, 10 * 500)
+        cheaper = {"engines": {"V8": 450, "V6": 300}, "colors": CATALOG["colors"]}
+        self.assertEqual(price_orders(specs, workers=0, catalog=cheaper).total, 10 * 450)
+
+    def test_process_pool_matches_inline(self):
+        """Sharding across processes gives the same totals"""
+        specs = [BuildSpec(SedanFactory, 3000),
+                 BuildSpec(TruckFactory, 2000, overrides={"engine": Engine("V12", price=2500)})]
+        inline = price_orders(specs, workers=0, catalog=CATALOG)
+        parallel = price_orders(specs, workers=2, shard_size=700, catalog=CATALOG)
+        self.assertEqual((parallel.cars, parallel.total), (inline.cars, inline.total))
+        self.assertEqual(parallel.max_price, 2500)
+        self.assertAlmostEqual(parallel.mean, inline.mean)
+
+    def test_reports_are_added_in_bulk(self):
+        """Per-car reports reach the ReportManager and its store"""
+        manager = ReportManager(os.path.join(self.tmpdir, 'reports.db'),
+                                os.path.join(self.tmpdir, 'reports.json'), capacity=10)
+        try:
+            price_orders([BuildSpec(SedanFactory, 40)], workers=2, shard_size=15,
+                         report_manager=manager, catalog=CATALOG)
+            self.assertEqual(len(manager.get_reports()), 10)
+            self.assertEqual(len(manager.query_reports(limit=100)), 40)
+        finally:
+            manager.close()
+
+    def test_summary_merge(self):
+        """Summaries combine counts, totals and extremes"""
+        summary = PricingSummary().add(PricingSummary(2, 30, 10, 20)).add(PricingSummary(1, 5, 5, 5))
+        self.assertEqual((summary.cars, summary.total, summary.min_price, summary.max_price),
+                         (3, 35, 5, 20))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from core.CarPartDatabase import CarPartDatabase
+from core.pricing import PriceTable, np
+from utils.singleton import SingletonMeta
+
+
+@unittest.skipUnless(np is not None, "NumPy is not installed")
+class TestPriceTable(unittest.TestCase):
+
+    def setUp(self):
+        """Load the default catalog into a price table."""
+        SingletonMeta.reset_all()
+        self.tmpdir = tempfile.mkdtemp()
+        self.database = CarPartDatabase(os.path.join(self.tmpdir, 'parts.db'))
+        self.table = PriceTable.from_database(self.database)
+        self.ids = {name: part_id for part_id, _, name, *_ in self.database.iter_parts()}
+
+    def tearDown(self):
+        self.database.close()
+        SingletonMeta.reset_all()
+        shutil.rmtree(self.tmpdir)
+
+    def config(self, *names):
+        return [self.ids[name] for name in names]
+
+    def test_price_matrix(self):
+        """Totals, extremes and per-slot prices come out of one pass"""
+        configs = np.array([self.config("V8", "red", "Pirelli", "alloy", "leather"),
+                            self.config("V6", "blue", "Michelin", "steel", "cloth")])
+        result = self.table.price(configs)
+        self.assertEqual(result.totals.tolist(), [1100.0, 600.0])
+        self.assertEqual((result.min, result.max, result.total), (600.0, 1100.0, 1700.0))
+        self.assertEqual(result.breakdown["engine"].tolist(), [500.0, 300.0])
+        self.assertEqual(result.breakdown["color"].tolist(), [0.0, 0.0])
+
+    def test_numeric_color_codes_are_free(self):
+        """A color code made of digits is stored as a number but still costs nothing"""
+        grey = self.database.add_part("colors", "grey", "808080")
+        table = PriceTable.from_database(self.database)
+        result = table.price({"engine": [self.ids["V6"]], "color": [grey]})
+        self.assertEqual(result.breakdown["color"].tolist(), [0.0])
+        self.assertEqual(result.totals.tolist(), [300.0])
+
+    def test_price_dict_of_slots(self):
+        """Configurations can be given per slot"""
+        result = self.table.price({"engine": [self.ids["V8"]] * 3, "tires": [self.ids["Pirelli"]] * 3})
+        self.assertEqual(result.totals.tolist(), [600.0] * 3)
+
+    def test_rejects_bad_ids(self):
+        """Unknown ids and parts in the wrong slot are refused"""
+        with self.assertRaises(ValueError):
+            self.table.price({"engine": [10 ** 6]})
+        with self.assertRaises(ValueError):
+            self.table.price({"engine": [self.ids["red"]]})
+
+
+if __name__ == '__main__':
+    unittest.main()
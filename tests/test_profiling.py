@@ -0,0 +1,62 @@
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+
+from main import parse_args
+from utils.profiling import Profiler, parse_rate
+
+
+def build_rows(count):
+    return [{"id": i, "name": f"part{i}"} for i in range(count)]
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.profiler = Profiler(sample_rate=1.0, output_dir=self.tmpdir, top=10)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def files(self, suffix):
+        return sorted(name for name in os.listdir(self.tmpdir) if name.endswith(suffix))
+
+    def test_profiled_call_writes_stats_and_allocations(self):
+        """A profiled call dumps loadable pstats and a text summary with allocation sites"""
+        rows = self.profiler.profile("core.build rows")(build_rows)(2000)
+        self.assertEqual(len(rows), 2000)
+        [prof], [text] = self.files(".prof"), self.files(".txt")
+        self.assertTrue(prof.startswith("core.build_rows-"))
+        self.assertIn("build_rows", str(pstats.Stats(os.path.join(self.tmpdir, prof)).stats))
+        with open(os.path.join(self.tmpdir, text)) as file:
+            summary = file.read()
+        self.assertIn("core.build rows:", summary)
+        self.assertIn("allocation sites", summary)
+        self.assertIn("test_profiling.py", summary)
+
+    def test_off_and_nested_calls(self):
+        """Rate 0 profiles nothing; a profiled call inside another is not profiled again"""
+        inner = self.profiler.profile("inner")(build_rows)
+        outer = self.profiler.profile("outer")(lambda: inner(10))
+        self.profiler.configure(sample_rate=0.0)
+        outer()
+        self.assertEqual(self.files(".prof"), [])
+        self.profiler.configure(sample_rate=1.0, memory=False)
+        outer()
+        [prof] = self.files(".prof")
+        self.assertTrue(prof.startswith("outer-"))
+
+    def test_parse_rate(self):
+        """Profile rates accept fractions and switch words, clamped to [0, 1]"""
+        self.assertEqual([parse_rate(value) for value in (None, "", "off", "1", "on", "0.25", "7", "x")],
+                         [0.0, 0.0, 0.0, 1.0, 1.0, 0.25, 1.0, 0.0])
+        self.assertEqual(parse_args(["--profile"]).profile, "1")
+        self.assertEqual(parse_args(["--profile", "0.1"]).profile, "0.1")
+        self.assertIsNone(parse_args([]).profile)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+
+from core.CarPartDatabase import ReportManager
+from core.report_writer import ReportWriter
+from utils.singleton import SingletonMeta
+
+
+def make_car(engine_price=1000, color_price=0):
+    engine = SimpleNamespace(get_name=lambda: "Engine", get_price=lambda: engine_price)
+    color = SimpleNamespace(get_name=lambda: "Color", get_price=lambda: color_price)
+    return SimpleNamespace(engine=engine, color=color)
+
+
+class ReportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Write reports into a throwaway directory."""
+        SingletonMeta.reset_all()
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmpdir, 'reports.db')
+        self.json_file = os.path.join(self.tmpdir, 'reports.json')
+
+    def tearDown(self):
+        SingletonMeta.reset_all()
+        shutil.rmtree(self.tmpdir)
+
+    def stored_reports(self):
+        conn = sqlite3.connect(self.db_file)
+        try:
+            return conn.execute('SELECT engine, color, price FROM reports ORDER BY id').fetchall()
+        finally:
+            conn.close()
+
+    def json_lines(self):
+        with open(self.json_file) as f:
+            return [json.loads(line) for line in f]
+
+
+class TestReportWriter(ReportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.manager = ReportManager(self.db_file, self.json_file, batch_size=10,
+                                     flush_interval=60)
+
+    def tearDown(self):
+        self.manager.close()
+        super().tearDown()
+
+    def test_flush_writes_both_sinks(self):
+        """flush() drains pending reports to the JSON file and the table"""
+        for price in (100, 200, 300):
+            self.manager.generate_report(make_car(engine_price=price))
+        self.manager.flush()
+        self.assertEqual([row[2] for row in self.stored_reports()], [100, 200, 300])
+        self.assertEqual([report["price"] for report in self.json_lines()], [100, 200, 300])
+
+    def test_batches_by_size(self):
+        """Full batches are written without waiting for the interval"""
+        for _ in range(25):
+            self.manager.generate_report(make_car())
+        self.manager.flush()
+        self.assertEqual(self.manager.writer.written, 25)
+        self.assertEqual(len(self.stored_reports()), 25)
+
+    def test_close_drains_queue(self):
+        """close() writes everything that was queued before it"""
+        for _ in range(5):
+            self.manager.generate_report(make_car())
+        self.manager.close()
+        self.assertEqual(len(self.stored_reports()), 5)
+        with self.assertRaises(RuntimeError):
+            self.manager.writer.submit({})
+
+    def test_closed_manager_is_replaced(self):
+        """After close() the same file gets a new, working manager"""
+        self.manager.close()
+        manager = ReportManager(self.db_file, self.json_file)
+        try:
+            self.assertIsNot(manager, self.manager)
+            manager.generate_report(make_car(engine_price=7))
+            manager.flush()
+            self.assertEqual([row[2] for row in self.stored_reports()], [7])
+        finally:
+            manager.close()
+
+    def test_invalid_reports_are_rejected(self):
+        """Reports missing a field or holding unserializable values never reach the queue"""
+        report = {"engine": "Engine", "color": "Color", "price": 1.0, "created_at": "now"}
+        with self.assertRaises(ValueError):
+            self.manager.writer.submit({"engine": "Engine"})
+        with self.assertRaises(ValueError):
+            self.manager.writer.submit(dict(report, price=object()))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(self.manager.add_reports([report, {"price": 2.0}, dict(report)]), 2)
+        self.manager.flush()
+        self.assertEqual(len(self.stored_reports()), 2)
+        self.assertEqual(len(self.manager.get_reports()), 2)
+
+    def test_failed_batch_keeps_writer_alive(self):
+        """A batch that fails while writing is dropped; flush returns and later batches land"""
+        report = {"engine": "Engine", "color": "Color", "price": 2 ** 70, "created_at": "now"}
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.manager.writer.submit(report)
+            self.manager.flush()
+        self.assertEqual(self.manager.writer.failed, 1)
+        self.manager.generate_report(make_car(engine_price=5))
+        self.manager.flush()
+        self.assertEqual([row[2] for row in self.stored_reports()], [5])
+
+
+class TestReportStore(ReportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.manager = ReportManager(self.db_file, self.json_file, capacity=3)
+
+    def tearDown(self):
+        self.manager.close()
+        super().tearDown()
+
+    def test_ring_buffer_is_bounded(self):
+        """Only the newest `capacity` reports are kept in memory"""
+        for price in range(5):
+            self.manager.generate_report(make_car(engine_price=price))
+        self.assertEqual([report["price"] for report in self.manager.get_reports()], [2, 3, 4])
+
+    def test_query_filters_and_pages(self):
+        """Older reports come back from SQLite, filtered and paginated"""
+        for price in range(10):
+            self.manager.generate_report(make_car(engine_price=price * 100))
+        page = self.manager.query_reports(min_price=200, max_price=700, limit=4)
+        self.assertEqual([report["price"] for report in page], [700, 600, 500, 400])
+        page = self.manager.query_reports(min_price=200, max_price=700, limit=4,
+                                          before_id=page[-1]["id"])
+        self.assertEqual([report["price"] for report in page], [300, 200])
+        self.assertEqual(self.manager.query_reports(engine="Turbine"), [])
+        self.assertEqual(len(self.manager.query_reports(color="Color", since="2000-01-01")), 10)
+
+    def test_query_uses_indexes(self):
+        """Filtered queries are served by the report indexes"""
+        plan = self.manager.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM reports WHERE engine = ?", ("V8",)).fetchall()
+        self.assertIn('idx_reports_engine', ' '.join(str(row) for row in plan))
+
+
+class TestReportWriterTiming(ReportTestCase):
+
+    def test_flushes_after_interval(self):
+        """A partial batch is written once the flush interval passes"""
+        ReportManager(self.db_file, self.json_file).close()
+        writer = ReportWriter(self.db_file, self.json_file, batch_size=1000, flush_interval=0.05)
+        writer.submit({"engine": "Engine", "color": "Color", "price": 1.0, "created_at": "now"})
+        for _ in range(100):
+            if writer.written:
+                break
+            time.sleep(0.01)
+        self.assertEqual(writer.written, 1)
+        writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import asyncio
+import http.client
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from core.CarPartDatabase import CarPartDatabase
+from service.server import CarPartsService
+from utils.singleton import SingletonMeta
+
+
+class TestCarPartsService(unittest.TestCase):
+
+    def setUp(self):
+        """Serve a fresh, seeded database on a free port from a background event loop."""
+        SingletonMeta.reset_all()
+        self.tmpdir = tempfile.mkdtemp()
+        self.database = CarPartDatabase(os.path.join(self.tmpdir, 'parts.db'))
+        self.service = CarPartsService(self.database, workers=2)
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def serve():
+            asyncio.set_event_loop(self.loop)
+            server = self.loop.run_until_complete(self.service.start("127.0.0.1", 0))
+            self.port = server.sockets[0].getsockname()[1]
+            started.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=serve, daemon=True)
+        self.thread.start()
+        started.wait(5)
+        self.client = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+
+    def tearDown(self):
+        self.client.close()
+        asyncio.run_coroutine_threadsafe(self.stop_server(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.service.close()
+        self.loop.close()
+        self.database.close()
+        SingletonMeta.reset_all()
+        shutil.rmtree(self.tmpdir)
+
+    async def stop_server(self):
+        self.service.server.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def request(self, method, path, body=None):
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        self.client.request(method, path, json.dumps(body) if body is not None else None, headers)
+        response = self.client.getresponse()
+        data = response.read().decode("utf-8")
+        if response.getheader("Content-Type") == "application/json":
+            data = json.loads(data)
+        return response.status, data
+
+    def test_part_lifecycle(self):
+        """Add, price, edit and delete a part over one keep-alive connection"""
+        status, data = self.request("POST", "/add_part",
+                                    {"part_type": "engines", "part_name": "V12", "price": 900})
+        self.assertEqual(status, 201)
+        self.assertEqual(self.request("POST", "/add_part", {"part_type": "engines",
+                                                            "part_name": "V12", "price": 900})[0], 409)
+        status, data = self.request("GET", "/get_price?part_name=V12")
+        self.assertEqual((status, data["parts"][0]["price"]), (200, 900.0))
+        self.assertEqual(self.request("PUT", "/edit_part", {"part_name": "V12", "new_price": 950})[0], 200)
+        self.assertEqual(self.request("GET", "/get_price?part_name=V12")[1]["parts"][0]["price"], 950)
+        self.assertEqual(self.request("DELETE", "/delete_part?part_name=V12")[0], 200)
+        self.assertEqual(self.request("GET", "/get_price?part_name=V12")[0], 404)
+        self.assertEqual(self.request("DELETE", "/delete_part?part_name=V12")[0], 404)
+
+    def test_bad_requests(self):
+        """Missing fields, bad numbers, wrong methods and unknown paths are rejected"""
+        self.assertEqual(self.request("POST", "/add_part", {"part_type": "engines"})[0], 400)
+        self.assertEqual(self.request("PUT", "/edit_part", {"part_name": "V8", "new_price": "x"})[0], 400)
+        self.assertEqual(self.request("GET", "/get_price")[0], 400)
+        self.assertEqual(self.request("GET", "/add_part")[0], 405)
+        self.assertEqual(self.request("GET", "/nothing")[0], 404)
+
+    def test_generate_report_streams(self):
+        """The inventory report arrives as chunked text"""
+        self.database.add_parts(("tires", f"tire{n:04d}", n) for n in range(2000))
+        status, text = self.request("GET", "/generate_report")
+        self.assertEqual(status, 200)
+        self.assertIn("\nENGINES:\n", text)
+        self.assertIn("tire1999: $1999", text)
+        self.assertIn("Report generated on", text)
+        # The connection is still usable afterwards
+        self.assertEqual(self.request("GET", "/get_price?part_name=V8")[0], 200)
+
+    def test_streams_leave_request_workers_free(self):
+        """Stalled report streams run on their own threads, so requests still get a worker"""
+        release = threading.Event()
+
+        def stalled():
+            release.wait(5)
+            yield "done"
+
+        async def check():
+            streams = [self.service.stream(stalled()) for _ in range(2)]
+            reads = [asyncio.ensure_future(anext(stream)) for stream in streams]
+            try:
+                result = await asyncio.wait_for(self.service.run(lambda: "free"), 2)
+            finally:
+                release.set()
+            chunks = await asyncio.gather(*reads)
+            for stream in streams:
+                await stream.aclose()
+            return result, chunks
+
+        result, chunks = asyncio.run_coroutine_threadsafe(check(), self.loop).result(5)
+        self.assertEqual((result, chunks), ("free", ["done", "done"]))
+
+    def test_metrics(self):
+        """Database calls made for requests show up in both metrics formats"""
+        self.request("GET", "/get_price?part_name=V8")
+        status, text = self.request("GET", "/metrics")
+        self.assertEqual(status, 200)
+        self.assertIn('carparts_calls_total{op="db.search_parts"}', text)
+        status, data = self.request("GET", "/metrics?format=json")
+        self.assertGreaterEqual(data["db.search_parts"]["calls"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
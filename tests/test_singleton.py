@@ -0,0 +1,75 @@
+import threading
+import time
+import unittest
+
+from utils.singleton import SingletonMeta
+
+
+class Counter(metaclass=SingletonMeta):
+    created = 0
+
+    def __init__(self):
+        time.sleep(0.01)  # Widen the window in which racing threads could both construct
+        Counter.created += 1
+
+
+class Store(metaclass=SingletonMeta):
+    @classmethod
+    def singleton_key(cls, db_file='default.db', *args, **kwargs):
+        return db_file
+
+    def __init__(self, db_file='default.db'):
+        self.db_file = db_file
+
+
+class TestSingletonMeta(unittest.TestCase):
+
+    def setUp(self):
+        SingletonMeta.reset_all()
+        Counter.created = 0
+
+    def tearDown(self):
+        SingletonMeta.reset_all()
+
+    def test_concurrent_first_call(self):
+        """Threads racing on the first call share one instance"""
+        barrier = threading.Barrier(8)
+        instances = []
+
+        def create():
+            barrier.wait()
+            instances.append(Counter())
+
+        threads = [threading.Thread(target=create) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(Counter.created, 1)
+        self.assertEqual(len({id(instance) for instance in instances}), 1)
+
+    def test_per_key_instances(self):
+        """singleton_key gives one instance per key, however it is passed"""
+        self.assertIs(Store('a.db'), Store(db_file='a.db'))
+        self.assertIsNot(Store('a.db'), Store('b.db'))
+        self.assertEqual(Store('b.db').db_file, 'b.db')
+        self.assertIs(Store(), Store('default.db'))
+
+    def test_reset(self):
+        """reset drops one key or the whole class, reset_all drops everything"""
+        a, b, counter = Store('a.db'), Store('b.db'), Counter()
+        Store.reset('a.db')
+        self.assertIsNot(Store('a.db'), a)
+        self.assertIs(Store('b.db'), b)
+        Store.reset()
+        self.assertIsNot(Store('b.db'), b)
+        self.assertIs(Counter(), counter)
+        self.assertEqual({id(instance) for instance in SingletonMeta.instances()},
+                         {id(Store('b.db')), id(counter)})
+        SingletonMeta.reset_all()
+        self.assertEqual(SingletonMeta.instances(), [])
+        self.assertIsNot(Counter(), counter)
+
+
+if __name__ == '__main__':
+    unittest.main()
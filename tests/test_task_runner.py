@@ -0,0 +1,82 @@
+import threading
+import time
+import unittest
+
+from gui.task_runner import TaskRunner
+
+
+class FakeRoot:
+    """Stands in for Tk: `after` callbacks run when the test pumps the loop."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+
+    def pump(self, runner, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while self.pending and time.monotonic() < deadline:
+            callbacks, self.pending = self.pending, []
+            for callback in callbacks:
+                callback()
+            time.sleep(0.001)
+
+
+class TestTaskRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.root = FakeRoot()
+        self.runner = TaskRunner(self.root, max_workers=2, budget=1)
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def test_result_delivered_on_loop_thread(self):
+        """on_done runs from the polling loop, not from the worker"""
+        seen = []
+        self.runner.submit(lambda task, a, b: (a + b, threading.current_thread()), 2, 3,
+                           on_done=lambda result: seen.append((result, threading.current_thread())))
+        self.root.pump(self.runner)
+        (value, worker), caller = seen[0]
+        self.assertEqual(value, 5)
+        self.assertIsNot(worker, caller)
+        self.assertIs(caller, threading.current_thread())
+        self.assertEqual(len(self.runner), 0)
+
+    def test_progress_and_errors(self):
+        """Progress arrives in order and exceptions go to on_error"""
+        progress, errors = [], []
+
+        def work(task):
+            for step in range(20):
+                task.report_progress(step + 1, 20)
+            raise ValueError("boom")
+
+        self.runner.submit(work, on_progress=lambda done, total, message: progress.append(done),
+                           on_error=errors.append)
+        self.root.pump(self.runner)
+        self.assertEqual(progress, list(range(1, 21)))
+        self.assertEqual(str(errors[0]), "boom")
+
+    def test_cancel(self):
+        """A cancelled task stops at its next check and reports nothing"""
+        started, results = threading.Event(), []
+
+        def work(task):
+            started.set()
+            while True:
+                task.check()
+                time.sleep(0.001)
+
+        task = self.runner.submit(work, on_done=results.append, on_error=results.append)
+        started.wait(5)
+        task.cancel()
+        self.root.pump(self.runner)
+        self.assertTrue(task.finished)
+        self.assertEqual(results, [])
+        self.assertEqual(len(self.runner), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
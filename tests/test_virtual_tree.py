@@ -0,0 +1,171 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from core.CarPartDatabase import CarPartDatabase
+from gui.task_runner import TaskRunner
+from gui.virtual_tree import PagedRows, VirtualTreeview
+from utils.singleton import SingletonMeta
+
+COLUMNS = ["id", "type", "name", "price"]
+
+
+class FakeRoot:
+    """Stands in for Tk: `after` callbacks run when the test pumps the loop."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+
+    def pump(self, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while self.pending and time.monotonic() < deadline:
+            callbacks, self.pending = self.pending, []
+            for callback in callbacks:
+                callback()
+            time.sleep(0.001)
+
+
+class HeadlessView(VirtualTreeview):
+    """A VirtualTreeview without widgets: records what it would render."""
+
+    def __init__(self, data, tasks, visible=20):
+        self.data = data
+        self.tasks = tasks
+        self.visible = visible
+        self.top = 0
+        self.total = 0
+        self.order_by = data.order_by
+        self.descending = False
+        self.name_prefix = None
+        self.generation = 0
+        self._data_query = None
+        self._lock = threading.Lock()
+        self._loading = None
+        self.rendered = []
+
+    def update_headings(self):
+        pass
+
+    def render(self, result):
+        self._loading = None
+        self.top, self.total, rows = result
+        self.rendered.append(rows)
+
+
+class TestPagedParts(unittest.TestCase):
+
+    def setUp(self):
+        """Fill a fresh database with a few hundred parts."""
+        SingletonMeta.reset_all()
+        self.tmpdir = tempfile.mkdtemp()
+        self.database = CarPartDatabase(os.path.join(self.tmpdir, 'parts.db'), seed=False)
+        self.database.add_parts((part_type, f"part{n:03d}", n % 37)
+                                for n in range(250) for part_type in ("tires", "wheels"))
+        self.database.add_parts([("colors", "red", "FF0000"), ("colors", "blue", "0000FF")])
+        self.calls = []
+
+    def tearDown(self):
+        self.database.close()
+        SingletonMeta.reset_all()
+        shutil.rmtree(self.tmpdir)
+
+    def fetch(self, order_by, descending, after, offset, limit, name_prefix):
+        self.calls.append((after, offset))
+        return self.database.page_parts(order_by, descending, after, offset, limit, name_prefix)
+
+    def count(self, name_prefix):
+        self.calls.append(("count", threading.current_thread()))
+        return self.database.count_parts(name_prefix)
+
+    def expected(self, order_by, descending=False, name_prefix=""):
+        rows = self.database.conn.execute(
+            f"SELECT id, type, name, price FROM parts WHERE name LIKE ? "
+            f"ORDER BY {order_by} {'DESC' if descending else 'ASC'}, id {'DESC' if descending else 'ASC'}",
+            (name_prefix + "%",)).fetchall()
+        return rows
+
+    def test_keyset_pages_cover_the_table(self):
+        """Following the last key page by page yields the full sort order"""
+        for order_by in ("name", "price", "type"):
+            for descending in (False, True):
+                rows, after = [], None
+                while True:
+                    page = self.database.page_parts(order_by, descending, after=after, limit=64)
+                    if not page:
+                        break
+                    rows.extend(page)
+                    after = (page[-1][COLUMNS.index(order_by)], page[-1][0])
+                self.assertEqual(rows, self.expected(order_by, descending))
+
+    def test_prefix_filter(self):
+        """Prefix filtering applies to counts and pages"""
+        self.assertEqual(self.database.count_parts("part00"), 20)
+        self.assertEqual(len(self.database.page_parts(name_prefix="part00", limit=100)), 20)
+        self.assertEqual(self.database.count_parts(), 502)
+        with self.assertRaises(ValueError):
+            self.database.page_parts(order_by="specs")
+
+    def test_paged_rows_random_access(self):
+        """Any window of rows matches the sorted table"""
+        data = PagedRows(self.fetch, self.database.count_parts, COLUMNS, order_by="price",
+                         page_size=50, max_pages=3)
+        expected = self.expected("price")
+        for start in (0, 45, 300, 120, 490, 499):
+            self.assertEqual(data.rows(start, 20), expected[start:start + 20])
+        data.reset(order_by="name", descending=True, name_prefix="part1")
+        self.assertEqual(data.total, 200)
+        self.assertEqual(data.rows(95, 10), self.expected("name", True, "part1")[95:105])
+
+    def test_sequential_scroll_uses_keys(self):
+        """Reading forward seeks by key; only jumps fall back to an offset"""
+        data = PagedRows(self.fetch, self.database.count_parts, COLUMNS, page_size=50)
+        for start in range(0, 200, 25):
+            data.rows(start, 25)
+        self.assertEqual([offset for _, offset in self.calls], [0, 0, 0, 0])
+        self.assertTrue(all(after is not None for after, _ in self.calls[1:]))
+        data.rows(400, 10)
+        self.assertEqual(self.calls[-1][1], 200)
+
+    def test_nothing_is_read_until_rows_are_asked_for(self):
+        """Construction and reset() leave the count and pages to the first read"""
+        data = PagedRows(self.fetch, self.count, COLUMNS, page_size=50)
+        data.reset(order_by="price", name_prefix="part1")
+        self.assertEqual(self.calls, [])
+        self.assertEqual(len(data.rows(0, 10)), 10)
+        self.assertEqual(self.calls[0][0], "count")
+
+    def test_view_reads_on_workers(self):
+        """Counts and pages are read off the loop thread; only the latest request renders"""
+        root = FakeRoot()
+        tasks = TaskRunner(root, max_workers=2)
+        try:
+            view = HeadlessView(PagedRows(self.fetch, self.count, COLUMNS, order_by="name",
+                                          page_size=50), tasks)
+            view.load()
+            root.pump()
+            self.assertEqual(view.rendered, [self.expected("name")[:20]])
+            self.assertIsNot(self.calls[0][1], threading.current_thread())
+
+            view.sort_by("price")
+            view.scroll(1, "pages")
+            root.pump()
+            self.assertEqual(len(view.rendered), 2)
+            self.assertEqual(view.rendered[-1], self.expected("price")[20:40])
+
+            view.set_filter("part1")
+            view.on_scrollbar("moveto", "1.0")
+            root.pump()
+            self.assertEqual((view.total, view.top), (200, 180))
+            self.assertEqual(view.rendered[-1], self.expected("price", name_prefix="part1")[180:])
+        finally:
+            tasks.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,226 @@
+"""
+Call counters, latency histograms and in-flight gauges for the hot paths.
+
+Functions are instrumented with `@instrument("db.add_part")`. Each operation keeps its
+statistics in one small list per thread, so recording a call takes no lock; readers sum
+the per-thread lists when exporting. Export with `registry.to_prometheus()` or
+`registry.to_json()`.
+
+Set CARPARTS_METRICS=0 to leave functions uninstrumented entirely, or call
+`registry.disable()` to make the wrappers a single flag check at run time.
+"""
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+
+# Latency histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Layout of a per-thread shard: counters, then one slot per bucket plus an overflow slot.
+# Finished calls are the sum of the buckets and calls in flight are STARTED minus that,
+# which keeps the hot path to three increments.
+STARTED, ERRORS, FAILURES, ITEMS, SECONDS, BUCKETS = range(6)
+
+
+class _ThreadShard(threading.local):
+    """`shard` is created on a thread's first access, so the hot path needs no lookup guard."""
+
+    def __init__(self, operation):
+        self.shard = operation.new_shard()
+
+
+class Operation:
+    """Call statistics for one instrumented operation."""
+
+    def __init__(self, name, bounds=DEFAULT_BUCKETS):
+        self.name = name
+        self.bounds = tuple(bounds)
+        self._shards = []
+        self._lock = threading.Lock()
+        self.local = _ThreadShard(self)
+
+    def new_shard(self):
+        """Create the calling thread's shard. Shards outlive their threads so no counts are lost."""
+        shard = [0] * (BUCKETS + len(self.bounds) + 1)
+        shard[SECONDS] = 0.0
+        with self._lock:
+            self._shards.append(shard)
+        return shard
+
+    def totals(self):
+        with self._lock:
+            shards = list(self._shards)
+        totals = [0] * (BUCKETS + len(self.bounds) + 1)
+        totals[SECONDS] = 0.0
+        for shard in shards:
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+    def stats(self):
+        totals = self.totals()
+        calls = sum(totals[BUCKETS:])
+        return {
+            "calls": calls,
+            "errors": totals[ERRORS],
+            "failures": totals[FAILURES],
+            "items": totals[ITEMS],
+            "in_flight": totals[STARTED] - calls,
+            "seconds": totals[SECONDS],
+            "buckets": dict(zip([repr(bound) for bound in self.bounds] + ["+Inf"], totals[BUCKETS:])),
+        }
+
+    def reset(self):
+        """Zero the counts. Calls in flight on other threads may be partly counted."""
+        with self._lock:
+            for shard in self._shards:
+                in_flight = shard[STARTED] - sum(shard[BUCKETS:])
+                shard[:] = [0] * len(shard)
+                shard[SECONDS] = 0.0
+                shard[STARTED] = in_flight
+
+
+class MetricsRegistry:
+    """Instrumented operations by name, with Prometheus text and JSON export."""
+
+    def __init__(self, enabled=True, prefix="carparts"):
+        self.enabled = enabled
+        # False when created disabled: `instrument` then returns functions unchanged
+        self.instrumented = enabled
+        self.prefix = prefix
+        self.operations = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def operation(self, name):
+        with self._lock:
+            operation = self.operations.get(name)
+            if operation is None:
+                operation = self.operations[name] = Operation(name)
+            return operation
+
+    def instrument(self, name, failure_values=(), items=None):
+        """
+        Decorator recording calls of the wrapped function under operation `name`. A result
+        that is one of `failure_values` (by identity, e.g. the None or False that database
+        methods return after printing an error) counts as a failure; an exception counts
+        as an error and is re-raised. With `items`, e.g. `len` for a batch fetch, the
+        operation also counts `items(result)` per call.
+        """
+        def decorate(func):
+            if not self.instrumented:
+                return func
+            operation = self.operation(name)
+            local = operation.local
+            bounds = operation.bounds
+            first_bound = bounds[0] if bounds else float("-inf")
+            perf_counter = time.perf_counter
+            bisect_left = bisect.bisect_left
+
+            def record_error(shard, start):
+                elapsed = perf_counter() - start
+                shard[ERRORS] += 1
+                shard[SECONDS] += elapsed
+                shard[BUCKETS + bisect_left(bounds, elapsed)] += 1
+
+            # Identity check as one set lookup; the values are kept alive by `failure_values`
+            failure_ids = frozenset(id(value) for value in failure_values)
+
+            if items is not None:
+                @functools.wraps(func)
+                def batch_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return func(*args, **kwargs)
+                    shard = local.shard
+                    shard[STARTED] += 1
+                    start = perf_counter()
+                    try:
+                        result = func(*args, **kwargs)
+                    except BaseException:
+                        record_error(shard, start)
+                        raise
+                    elapsed = perf_counter() - start
+                    shard[SECONDS] += elapsed
+                    shard[BUCKETS + bisect_left(bounds, elapsed)] += 1
+                    shard[ITEMS] += items(result)
+                    return result
+                return batch_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                shard = local.shard
+                shard[STARTED] += 1
+                start = perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                except BaseException:
+                    record_error(shard, start)
+                    raise
+                elapsed = perf_counter() - start
+                shard[SECONDS] += elapsed
+                # Most calls land in the first bucket; skip the search for them
+                if elapsed <= first_bound:
+                    shard[BUCKETS] += 1
+                else:
+                    shard[BUCKETS + bisect_left(bounds, elapsed)] += 1
+                if failure_ids and id(result) in failure_ids:
+                    shard[FAILURES] += 1
+                return result
+            return wrapper
+        return decorate
+
+    def snapshot(self):
+        """Statistics of every operation, by name."""
+        with self._lock:
+            operations = sorted(self.operations.items())
+        return {name: operation.stats() for name, operation in operations}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """The metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        families = (("calls_total", "counter", "calls", "Calls per operation"),
+                    ("errors_total", "counter", "errors", "Calls that raised an exception"),
+                    ("failures_total", "counter", "failures", "Calls that returned a failure value"),
+                    ("items_total", "counter", "items", "Items returned by batch operations"),
+                    ("in_flight", "gauge", "in_flight", "Calls currently running"))
+        for suffix, kind, key, help in families:
+            name = f"{self.prefix}_{suffix}"
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            lines += [f'{name}{{op="{op}"}} {stats[key]}' for op, stats in snapshot.items()]
+
+        name = f"{self.prefix}_call_seconds"
+        lines += [f"# HELP {name} Call latency in seconds", f"# TYPE {name} histogram"]
+        for op, stats in snapshot.items():
+            cumulative = 0
+            for bound, count in stats["buckets"].items():
+                cumulative += count
+                lines.append(f'{name}_bucket{{op="{op}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{op="{op}"}} {stats["seconds"]}')
+            lines.append(f'{name}_count{{op="{op}"}} {stats["calls"]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Zero every operation, keeping the instrumented functions attached."""
+        with self._lock:
+            operations = list(self.operations.values())
+        for operation in operations:
+            operation.reset()
+
+
+# Process-wide registry used by the core, auth and report modules
+registry = MetricsRegistry(enabled=os.environ.get("CARPARTS_METRICS", "1") != "0")
+instrument = registry.instrument
@@ -0,0 +1,141 @@
+"""
+Opt-in profiling of selected entry points with cProfile and tracemalloc.
+
+Entry points are wrapped with `@profile("data_io.import_parts_csv")`. Profiling is off
+unless CARPARTS_PROFILE is set, or `main.py` is started with `--profile`. The value is the
+fraction of calls to profile: 1 profiles every call, 0.05 one call in twenty, which keeps
+the cost low enough to leave on in production. While off, the wrapper only checks the rate.
+
+Each profiled call writes two files to CARPARTS_PROFILE_DIR (default `profiles`):
+
+    <name>-<time>-<pid>-<n>.prof   cProfile stats; open with `python -m pstats <file>`
+    <name>-<time>-<pid>-<n>.txt    top functions by cumulative time and top allocation sites
+
+One call is profiled at a time; calls made meanwhile, including nested profiled calls,
+run unprofiled.
+"""
+import cProfile
+import functools
+import io
+import itertools
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+
+def parse_rate(value):
+    """Sampling rate from a CARPARTS_PROFILE or `--profile` value; unset or invalid is 0."""
+    if value is None or value.strip().lower() in ("", "0", "false", "off", "no"):
+        return 0.0
+    if value.strip().lower() in ("true", "on", "yes"):
+        return 1.0
+    try:
+        return min(max(float(value), 0.0), 1.0)
+    except ValueError:
+        print(f"Error parsing profile rate {value!r}; profiling stays off")
+        return 0.0
+
+
+class Profiler:
+    """Profiles a sampled fraction of calls to wrapped functions and dumps each to files."""
+
+    def __init__(self, sample_rate=0.0, output_dir="profiles", top=30, memory=True):
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.top = top
+        self.memory = memory
+        self._active = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    def configure(self, sample_rate=None, output_dir=None, top=None, memory=None):
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if output_dir is not None:
+            self.output_dir = output_dir
+        if top is not None:
+            self.top = top
+        if memory is not None:
+            self.memory = memory
+
+    def profile(self, name):
+        """Decorator profiling sampled calls of the wrapped function under `name`."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.sample_rate:
+                    return func(*args, **kwargs)
+                return self.call(name, func, *args, **kwargs)
+            return wrapper
+        return decorate
+
+    def call(self, name, func, *args, **kwargs):
+        """Call `func`, profiling it if this call is sampled and no other profile is running."""
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return func(*args, **kwargs)
+        if not self._active.acquire(blocking=False):
+            return func(*args, **kwargs)
+        try:
+            started_tracing = self.memory and not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            before = tracemalloc.take_snapshot() if self.memory else None
+            profile = cProfile.Profile()
+            start = time.perf_counter()
+            profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                elapsed = time.perf_counter() - start
+                after = tracemalloc.take_snapshot() if self.memory else None
+                if started_tracing:
+                    tracemalloc.stop()
+                self.dump(name, profile, elapsed, before, after)
+        finally:
+            self._active.release()
+
+    def dump(self, name, profile, elapsed, before=None, after=None):
+        """Write the `.prof` and `.txt` files of one profiled call; returns their base path."""
+        stem = "-".join([re.sub(r"[^\w.]+", "_", name), datetime.now().strftime("%Y%m%d-%H%M%S"),
+                         str(os.getpid()), str(next(self._sequence))])
+        base = os.path.join(self.output_dir, stem)
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            profile.dump_stats(base + ".prof")
+            with open(base + ".txt", "w", encoding="utf-8") as file:
+                file.write(f"{name}: {elapsed * 1000:.2f} ms\n\n")
+                file.write(self.format_stats(profile))
+                if before is not None and after is not None:
+                    file.write(self.format_allocations(before, after))
+            return base
+        except OSError as e:
+            print(f"Error writing profile {base}: {e}")
+            return None
+
+    def format_stats(self, profile):
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(self.top)
+        return stream.getvalue()
+
+    def format_allocations(self, before, after):
+        """The `top` lines whose allocated memory grew the most during the call."""
+        ignore = (tracemalloc.Filter(False, tracemalloc.__file__),
+                  tracemalloc.Filter(False, __file__))
+        stats = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+        lines = [f"Top {self.top} allocation sites (size change, count change):"]
+        for stat in stats[:self.top]:
+            frame = stat.traceback[0]
+            lines.append(f"  {frame.filename}:{frame.lineno}  {stat.size_diff / 1024:+.1f} KiB  "
+                         f"{stat.count_diff:+d} blocks")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide profiler, configured from the environment; main.py --profile overrides it
+profiler = Profiler(sample_rate=parse_rate(os.environ.get("CARPARTS_PROFILE")),
+                    output_dir=os.environ.get("CARPARTS_PROFILE_DIR", "profiles"))
+profile = profiler.profile
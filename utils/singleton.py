@@ -1,7 +1,58 @@
+import threading
+
+
 class SingletonMeta(type):
+    """
+    Metaclass that gives each class a single shared instance.
+
+    A class can define a `singleton_key(cls, *args, **kwargs)` classmethod taking the
+    constructor arguments; it then gets one instance per key (for example per database
+    file) instead of one per class. Creation is guarded by a lock, but once an instance
+    exists it is returned without locking. `reset()` drops instances so the next call
+    builds a fresh one; it does not close them.
+    """
     _instances = {}
+    _lock = threading.RLock()
+
+    def _instance_key(cls, args, kwargs):
+        key_func = getattr(cls, 'singleton_key', None)
+        if key_func is None:
+            return cls
+        return (cls, key_func(*args, **kwargs))
 
     def __call__(cls, *args, **kwargs):
-        if cls not in cls._instances:
-            cls._instances[cls] = super().__call__(*args, **kwargs)
-        return cls._instances[cls] 
\ No newline at end of file
+        key = cls._instance_key(args, kwargs)
+        instance = cls._instances.get(key)
+        if instance is None:
+            with SingletonMeta._lock:
+                # Another thread may have built it while we waited for the lock
+                instance = cls._instances.get(key)
+                if instance is None:
+                    instance = super().__call__(*args, **kwargs)
+                    cls._instances[key] = instance
+        return instance
+
+    def reset(cls, *args, **kwargs):
+        """
+        Forget the instance the given constructor arguments map to, or every instance of
+        the class when called without arguments.
+        """
+        with SingletonMeta._lock:
+            if args or kwargs:
+                cls._instances.pop(cls._instance_key(args, kwargs), None)
+                return
+            for key in list(cls._instances):
+                if key is cls or (isinstance(key, tuple) and key[0] is cls):
+                    del cls._instances[key]
+
+    @classmethod
+    def instances(mcs):
+        """Every live singleton instance, e.g. to close them all."""
+        with mcs._lock:
+            return list(mcs._instances.values())
+
+    @classmethod
+    def reset_all(mcs):
+        """Forget every singleton instance of every class."""
+        with mcs._lock:
+            mcs._instances.clear()